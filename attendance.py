@@ -0,0 +1,159 @@
+import bisect
+import csv
+import io
+import json
+import os
+import threading
+from datetime import date
+
+# Append-only attendance log (Username,Date) and its compacted index snapshot
+ATTENDANCE_FILE = "attendance.csv"
+SNAPSHOT_FILE = "attendance_snapshot.json"
+
+# Compact on load once this many bytes of the log are not covered by the snapshot
+COMPACT_AFTER_BYTES = 1 << 20
+
+
+# Attendance history for every member.
+#
+# Each member's visits are kept as a sorted list of day ordinals, together with the
+# first day of their latest run of consecutive visits, so "attended today?" and the
+# current streak are O(1) and "visits in the last N days" is a binary search.
+class AttendanceLedger:
+    def __init__(self, path=ATTENDANCE_FILE, snapshot_path=SNAPSHOT_FILE):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.days = {}
+        self.run_start = {}
+        self.offset = 0
+        self._lock = threading.RLock()
+
+        self._load_snapshot()
+        replayed = self._catch_up()
+        if replayed > COMPACT_AFTER_BYTES:
+            self.compact()
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        # Ignore a snapshot that covers more than the log holds (log replaced or truncated)
+        if not os.path.exists(self.path) or snapshot["offset"] > os.path.getsize(self.path):
+            return
+        self.offset = snapshot["offset"]
+        for username, days in snapshot["users"].items():
+            self.days[username] = days
+            self._update_run_start(username)
+
+    # Function to read entries appended to the log (by any process) since we last looked
+    def _catch_up(self):
+        if not os.path.exists(self.path):
+            with open(self.path, "w", newline="") as f:
+                f.write("Username,Date\n")
+        if os.path.getsize(self.path) <= self.offset:
+            return 0
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        # Only consume complete lines; a writer may be halfway through the last one
+        end = data.rfind(b"\n") + 1
+        for row in csv.reader(io.StringIO(data[:end].decode("utf-8"))):
+            if len(row) != 2 or row[0] == "Username":
+                continue
+            try:
+                day = date.fromisoformat(row[1].strip()).toordinal()
+            except ValueError:
+                continue
+            self._add(row[0], day)
+        self.offset += end
+        return end
+
+    def _add(self, username, day):
+        days = self.days.setdefault(username, [])
+        if days and days[-1] >= day:
+            index = bisect.bisect_left(days, day)
+            if index < len(days) and days[index] == day:
+                return False
+            days.insert(index, day)
+            self._update_run_start(username)
+        else:
+            if not days or day != days[-1] + 1:
+                self.run_start[username] = day
+            days.append(day)
+        return True
+
+    # Function to find where the member's latest run of consecutive days begins
+    def _update_run_start(self, username):
+        days = self.days[username]
+        index = len(days) - 1
+        while index > 0 and days[index - 1] == days[index] - 1:
+            index -= 1
+        self.run_start[username] = days[index] if days else None
+
+    # Function to record a visit; returns False if that day was already recorded
+    def record(self, username, day=None):
+        day = day or date.today()
+        with self._lock:
+            self._catch_up()
+            if not self._add(username, day.toordinal()):
+                return False
+            line = io.StringIO()
+            csv.writer(line, lineterminator="\n").writerow([username, day.isoformat()])
+            with open(self.path, "ab") as f:
+                f.write(line.getvalue().encode("utf-8"))
+            self._catch_up()
+            return True
+
+    def attended(self, username, day=None):
+        day = (day or date.today()).toordinal()
+        with self._lock:
+            self._catch_up()
+            days = self.days.get(username)
+            if not days:
+                return False
+            if days[-1] == day:
+                return True
+            index = bisect.bisect_left(days, day)
+            return index < len(days) and days[index] == day
+
+    # Consecutive days attended, ending today (or yesterday if today is not marked yet)
+    def current_streak(self, username, today=None):
+        today = (today or date.today()).toordinal()
+        with self._lock:
+            self._catch_up()
+            days = self.days.get(username)
+            if not days or days[-1] < today - 1:
+                return 0
+            return days[-1] - self.run_start[username] + 1
+
+    def visits_in_last(self, username, n_days, today=None):
+        today = (today or date.today()).toordinal()
+        with self._lock:
+            self._catch_up()
+            days = self.days.get(username, [])
+            return bisect.bisect_right(days, today) - bisect.bisect_left(days, today - n_days + 1)
+
+    # Function to write the in-memory index to the snapshot so startup skips replaying the log
+    def compact(self):
+        with self._lock:
+            self._catch_up()
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"offset": self.offset, "users": self.days}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.snapshot_path)
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+# Function to get the process-wide attendance ledger
+def get_ledger():
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = AttendanceLedger()
+    return _ledger
@@ -0,0 +1,62 @@
+# Type-ahead search latency over the catalogs, at their real size and scaled up.
+#
+# The scaled catalogs repeat every entry under numbered categories ("Proteins & Meats 7"),
+# so the vocabulary stays realistic while the number of entries grows. Queries are typed
+# one keystroke at a time, the way the search box sees them.
+#
+#   python -m benchmarks.catalog_search [--scales 1 10 100] [--repeat 20]
+
+import argparse
+import time
+
+import numpy as np
+
+import catalog
+
+QUERIES = ["omega-3", "kettlebell", "yoga balance", "vitamin c", "protein shake", "squats", "cardio",
+           "strength", "b", "zzz"]
+
+
+def scaled_data(data, scale):
+    if scale == 1:
+        return data
+    scaled = {}
+    for name, entries in data.items():
+        if name == "age_guide":
+            scaled[name] = {f"{group} {copy}": advice for copy in range(scale) for group, advice in entries.items()}
+        else:
+            scaled[name] = {f"{category} {copy}": items for copy in range(scale) for category, items in entries.items()}
+    return scaled
+
+
+def keystrokes(query):
+    return [query[:length] for length in range(1, len(query) + 1)]
+
+
+def run(scale, repeat):
+    data = catalog.Catalog.load().data
+    start = time.perf_counter()
+    index = catalog.Catalog(scaled_data(data, scale))
+    build_s = time.perf_counter() - start
+
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            for typed in keystrokes(query):
+                start = time.perf_counter()
+                index.search(typed)
+                timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1e6
+    print(f"scale {scale:4d}: {len(index.entries):7d} entries, index built in {build_s * 1000:7.1f} ms;  "
+          f"search p50 {np.percentile(timings, 50):7.1f} us  p99 {np.percentile(timings, 99):7.1f} us  "
+          f"max {timings.max():7.1f} us", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        run(scale, args.repeat)
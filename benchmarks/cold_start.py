@@ -0,0 +1,69 @@
+# Cold start of the app in a fresh interpreter.
+#
+# Times `import streamlit`, then the first render of the login page (all the script's own
+# imports and user loading included), and reports which heavy modules that render loaded.
+# With --fitness it also times the first render of the fitness page. Timings are appended
+# to the stage metrics file (see instrumentation.py) so they can be tracked over time.
+#
+#   python -m benchmarks.cold_start [--script "personal fitness tracker web app.py"] [--fitness USER]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = "personal fitness tracker web app.py"
+HEAVY_MODULES = ["pandas", "numpy", "sklearn", "joblib", "dataset", "model_trainer"]
+
+
+def measure(script, fitness_user):
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    result = {"streamlit_import_s": time.perf_counter() - start}
+
+    app = AppTest.from_file(os.path.abspath(script), default_timeout=600)
+    start = time.perf_counter()
+    app.run()
+    result["first_login_render_s"] = time.perf_counter() - start
+    result["loaded_for_login"] = [name for name in HEAVY_MODULES if name in sys.modules]
+    result["errors"] = [error.message for error in app.exception]
+
+    if fitness_user:
+        app.session_state.login = True
+        app.session_state.current_user = fitness_user
+        start = time.perf_counter()
+        app.run()
+        result["first_fitness_render_s"] = time.perf_counter() - start
+        result["errors"] += [error.message for error in app.exception]
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--script", default=APP_SCRIPT)
+    parser.add_argument("--fitness", metavar="USER", help="also render the fitness page logged in as USER")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.script, args.fitness)))
+    else:
+        command = [sys.executable, "-m", "benchmarks.cold_start", "--child", "--script", args.script]
+        if args.fitness:
+            command += ["--fitness", args.fitness]
+        output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        import instrumentation
+
+        for name in ("streamlit_import_s", "first_login_render_s", "first_fitness_render_s"):
+            if name in result:
+                instrumentation.record(f"cold_start_{name[:-2]}", result[name])
+                print(f"{name[:-2]}: {result[name] * 1000:.0f} ms")
+        print(f"modules loaded for the login page: {', '.join(result['loaded_for_login']) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+        if result["errors"]:
+            print("errors:", *result["errors"], sep="\n  ")
+            sys.exit(1)
@@ -0,0 +1,74 @@
+# Cost of turning inputs into model features: the DataFrame route vs the fitted encoder.
+#
+# Per row: the slider dict as a one-row DataFrame reindexed to the model's columns, vs
+# FeatureEncoder.encode_row into a preallocated array. Per batch: pd.get_dummies plus
+# reindex on raw sessions, vs FeatureEncoder.encode. Also times a one-row prediction of
+# the packed forest (if one is published) fed from each route.
+#
+#   python -m benchmarks.feature_encoding [--repeat 20000] [--rows 100000]
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import model_backends
+
+SLIDER_INPUT = {"Age": 30, "BMI": 20, "Duration": 15, "Heart_Rate": 80, "Body_Temp": 38,
+                "Sleep_Time": 6, "Water_Hydrate_Level": 5, "Gender_male": 1}
+
+
+def per_call_us(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(repeat, rows):
+    exercise_df = dataset.load_exercise_df()
+    _, _, _, _, encoder = model_backends.training_frames(exercise_df, return_encoder=True)
+    columns = encoder.columns
+
+    def dataframe_row():
+        return pd.DataFrame(SLIDER_INPUT, index=[0]).reindex(columns=columns, fill_value=0)
+
+    out = np.empty(encoder.width)
+    dataframe_us = per_call_us(dataframe_row, repeat)
+    encoder_us = per_call_us(lambda: encoder.encode_row(SLIDER_INPUT, out), repeat)
+    print(f"one row:  DataFrame + reindex {dataframe_us:8.1f} us   encode_row {encoder_us:6.2f} us   "
+          f"({dataframe_us / encoder_us:.0f}x)")
+
+    sessions = exercise_df.sample(rows, replace=True, random_state=0)[model_backends.TRAINING_COLUMNS]
+    start = time.perf_counter()
+    pd.get_dummies(sessions, drop_first=True).drop("Calories", axis=1).reindex(columns=columns, fill_value=0)
+    dummies_s = time.perf_counter() - start
+    start = time.perf_counter()
+    encoder.encode(sessions)
+    encode_s = time.perf_counter() - start
+    print(f"{rows} rows: get_dummies + reindex {dummies_s * 1e3:8.1f} ms   encode {encode_s * 1e3:6.1f} ms   "
+          f"({dummies_s / rows * 1e9:.0f} vs {encode_s / rows * 1e9:.0f} ns/row)")
+
+    import forest_export
+    import model_store
+
+    folder = model_store.shared_forest_path(model_store.model_key())
+    if os.path.isdir(folder):
+        forest = forest_export.NumpyForest.attach(folder)
+        frame_us = per_call_us(lambda: forest.predict(dataframe_row()), repeat // 10)
+        array_us = per_call_us(lambda: forest.predict(encoder.encode_row(SLIDER_INPUT, out)), repeat // 10)
+        print(f"one-row forest prediction: via DataFrame {frame_us:8.1f} us   via encode_row {array_us:8.1f} us")
+    else:
+        print("No published forest for the current data; open the fitness page once to time predictions too.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.repeat, args.rows)
@@ -0,0 +1,76 @@
+# Parity and latency check for the NumPy forest evaluator.
+#
+# Trains a forest with the app's hyperparameters on the app's data, exports it, and
+# checks that NumpyForest.predict matches RandomForestRegressor.predict on the held-out
+# rows. Then compares import time (fresh interpreter) and predict latency for one row
+# and for a batch. Exits non-zero if predictions differ.
+#
+#   python -m benchmarks.forest_export_parity [--trees 1000]
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(statement):
+    code = f"import time; s = time.perf_counter(); {statement}; print(time.perf_counter() - s)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip())
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(trees):
+    import dataset
+    import forest_export
+    import model_backends
+    import model_store
+
+    X_train, X_test, y_train, _ = model_backends.training_frames(dataset.load_exercise_df())
+    config = dict(model_store.MODEL_PARAMS, backend="forest", n_estimators=trees)
+    model = model_backends.make_model(config).fit(X_train, y_train)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "forest.npz")
+        forest_export.save_forest(model, path)
+        forest = forest_export.NumpyForest.load(path)
+
+    expected = model.predict(X_test)
+    actual = forest.predict(X_test)
+    max_error = float(np.max(np.abs(expected - actual)))
+    print(f"parity on {len(X_test)} held-out rows: max abs difference {max_error:.2e}")
+
+    one_row = X_test.iloc[:1]
+    one_array = one_row.to_numpy()
+    X_array = X_test.to_numpy()
+    print(f"import sklearn.ensemble: {import_time('import sklearn.ensemble') * 1000:.0f} ms")
+    print(f"import forest_export:    {import_time('import forest_export') * 1000:.0f} ms")
+    print(f"predict 1 row:    sklearn {best_of(lambda: model.predict(one_row), 5) * 1000:.2f} ms, "
+          f"numpy {best_of(lambda: forest.predict(one_array), 5) * 1000:.2f} ms")
+    print(f"predict {len(X_array)} rows: sklearn {best_of(lambda: model.predict(X_test), 3) * 1000:.1f} ms, "
+          f"numpy {best_of(lambda: forest.predict(X_array), 3) * 1000:.1f} ms")
+    return max_error < 1e-6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trees", type=int, default=1000)
+    args = parser.parse_args()
+    if not run(args.trees):
+        print("FAILED: predictions differ from sklearn")
+        sys.exit(1)
+    print("OK: predictions match sklearn")
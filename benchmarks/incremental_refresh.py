@@ -0,0 +1,63 @@
+# Incremental refresh vs full retrain as the dataset grows.
+#
+# A fixed 20% of the rows is held out for scoring. The forest is first trained on a base
+# slice of the rest, then batches of rows are "appended" one at a time. After each batch
+# the script times an incremental refresh (incremental.refresh) and a full retrain on all
+# rows so far, and reports the MAE of both on the holdout.
+#
+#   python -m benchmarks.incremental_refresh [--trees 200] [--base 4000] [--batch 1000]
+
+import argparse
+import time
+
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+import dataset
+import incremental
+import model_backends
+import model_store
+
+
+def features(frame):
+    frame = pd.get_dummies(frame[model_backends.TRAINING_COLUMNS], drop_first=True)
+    return frame.drop("Calories", axis=1), frame["Calories"]
+
+
+def run(trees, base, batch):
+    exercise_df = dataset.build_exercise_df()
+    pool, holdout = train_test_split(exercise_df, test_size=0.2, random_state=1)
+    pool = pool.reset_index(drop=True)
+    X_holdout, y_holdout = features(holdout)
+    config = dict(model_store.MODEL_PARAMS, backend="forest", n_estimators=trees, n_jobs=-1)
+
+    X, y = features(pool.iloc[:base])
+    model = model_backends.make_model(config).fit(X, y)
+    model.training_rows_ = model.full_training_rows_ = base
+
+    print(f"{'rows':>7}{'refresh s':>11}{'refresh MAE':>13}{'full s':>9}{'full MAE':>10}")
+    for rows in range(base + batch, len(pool) + 1, batch):
+        current = pool.iloc[:rows]
+
+        start = time.perf_counter()
+        model = incremental.refresh(model, current, config, trees=max(1, trees // 10), random_state=rows)
+        refresh_time = time.perf_counter() - start
+        refresh_mae = mean_absolute_error(y_holdout, model.predict(X_holdout))
+
+        start = time.perf_counter()
+        X, y = features(current)
+        full = model_backends.make_model(config).fit(X, y)
+        full_time = time.perf_counter() - start
+        full_mae = mean_absolute_error(y_holdout, full.predict(X_holdout))
+
+        print(f"{rows:>7}{refresh_time:>11.3f}{refresh_mae:>13.3f}{full_time:>9.3f}{full_mae:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--base", type=int, default=4000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.trees, args.base, args.batch)
@@ -0,0 +1,85 @@
+# Interaction latency of the logged-in page, measured with Streamlit's AppTest.
+#
+# The app is copied into a temporary folder (so users and attendance are untouched),
+# logged in, run once to warm the model cache, and then timed while changing a catalog
+# selectbox and while changing a User Input Parameters slider.
+#
+# --ref times the app as it was at a git revision instead of the working tree, so a
+# change can be compared with the page before it (e.g. --ref a29204b~1 for the page
+# before it was split into fragments).
+#
+#   python -m benchmarks.interaction_latency [--repeat 5] [--ref REVISION]
+
+import argparse
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import tarfile
+import tempfile
+import time
+
+APP_FILE = "personal fitness tracker web app.py"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def median_rerun(app, action, repeat):
+    timings = []
+    for i in range(repeat):
+        action(app, i)
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def change_food(app, i):
+    food = next(w for w in app.selectbox if w.label == "Select Food")
+    food.set_value(food.options[(i + 1) % len(food.options)])
+
+
+def change_age(app, i):
+    next(w for w in app.slider if w.label == "Age: ").set_value(31 + i)
+
+
+# Function to copy the app into folder: the working tree, or the files at a git revision
+def copy_app(folder, ref=None):
+    if ref is None:
+        shutil.copytree(ROOT, folder, dirs_exist_ok=True, ignore=shutil.ignore_patterns(".git", "__pycache__"))
+        return
+    archive = subprocess.run(["git", "-C", ROOT, "archive", "--format=tar", ref],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(folder)
+
+
+def run(repeat, ref=None):
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as folder:
+        copy_app(folder, ref)
+        cwd = os.getcwd()
+        os.chdir(folder)
+        try:
+            app = AppTest.from_file(os.path.join(folder, APP_FILE), default_timeout=600)
+            app.session_state.login = True
+            app.session_state.current_user = "benchmark"
+            app.run()
+
+            results = {
+                "catalog_change_s": median_rerun(app, change_food, repeat),
+                "slider_change_s": median_rerun(app, change_age, repeat),
+            }
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ref", help="time the app at this git revision instead of the working tree")
+    args = parser.parse_args()
+    for name, seconds in run(args.repeat, args.ref).items():
+        print(f"{name}: {seconds:.3f}")
@@ -0,0 +1,76 @@
+# Daily nutrition totals for many members: a Python loop over the food dicts vs FoodTable.
+#
+# Generates random days (a few foods with random amounts each) and totals Calories,
+# Protein, Fat and vitamins per day both ways, checking that the results agree.
+#
+#   python -m benchmarks.meal_totals [--days 1000 100000] [--items 3 12]
+
+import argparse
+import time
+
+import numpy as np
+
+import catalog
+import nutrition
+
+
+def random_days(table, days, items, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(items[0], items[1] + 1, size=days)
+    food_ids = rng.integers(0, len(table.names), size=sizes.sum())
+    grams = rng.integers(1, 20, size=sizes.sum()) * 25
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    return [[(table.names[f], int(g)) for f, g in zip(food_ids[a:b], grams[a:b])] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+# Function to total one day the way the sidebar reads the food dicts
+def loop_totals(foods, items):
+    totals = dict.fromkeys(nutrition.NUTRIENTS, 0.0)
+    vitamins = set()
+    for food, grams in items:
+        info = foods[food]
+        for nutrient in nutrition.NUTRIENTS:
+            totals[nutrient] += info[nutrient] * grams / nutrition.PER_GRAMS
+        vitamins.update(info["Vitamins"])
+    return totals, vitamins
+
+
+def run(days, items):
+    table = nutrition.get_food_table()
+    foods = {name: info for category in catalog.get_catalog().foods.values() for name, info in category.items()}
+    member_days = random_days(table, days, items)
+    table.day_totals(member_days[:1])  # Warm up (imports scipy.sparse)
+
+    start = time.perf_counter()
+    looped = [loop_totals(foods, day) for day in member_days]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    values, masks = table.day_totals(member_days)
+    table_s = time.perf_counter() - start
+
+    # The same days as flat arrays (how a batch job would hold them) skip the tuple unpacking
+    sizes = [len(day) for day in member_days]
+    day_ids = np.repeat(np.arange(days), sizes)
+    food_ids = np.array([table.index[food] for day in member_days for food, _ in day])
+    grams = np.array([amount for day in member_days for _, amount in day], dtype=np.float64)
+    start = time.perf_counter()
+    table.day_totals_arrays(day_ids, food_ids, grams, days)
+    arrays_s = time.perf_counter() - start
+
+    expected = np.array([[totals[n] for n in nutrition.NUTRIENTS] for totals, _ in looped])
+    assert np.allclose(values, expected)
+    assert all(set(table.vitamin_names(mask)) == vitamins for mask, (_, vitamins) in zip(masks, looped))
+
+    print(f"{days:8d} days ({len(day_ids)} items): loop {loop_s * 1000:8.1f} ms   day_totals {table_s * 1000:7.1f} ms   "
+          f"from arrays {arrays_s * 1000:6.1f} ms   ({loop_s / arrays_s:.0f}x)", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--items", type=int, nargs=2, default=[3, 12], metavar=("MIN", "MAX"))
+    args = parser.parse_args()
+
+    for count in args.days:
+        run(count, args.items)
@@ -0,0 +1,100 @@
+# Load test for prediction_service.py, with and without request micro-batching.
+#
+# For each batching window the service is started in its own process, then N client
+# threads each send single-row /predict requests over a keep-alive connection.
+# Reports throughput and p50/p99 latency, plus the service's average batch size.
+#
+#   python -m benchmarks.prediction_service_load [--clients 32] [--requests 200] [--windows 0 2]
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_up(port, process, timeout=600):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The prediction service exited during startup")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("The prediction service did not start in time")
+
+
+def request(connection, method, path, payload=None):
+    body = json.dumps(payload) if payload is not None else None
+    connection.request(method, path, body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def run(window_ms, clients, requests, port):
+    process = subprocess.Popen([sys.executable, "prediction_service.py", "--port", str(port), "--window-ms", str(window_ms)],
+                               cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        wait_until_up(port, process)
+        latencies = [[] for _ in range(clients)]
+        failures = []
+
+        def client(index):
+            rng = np.random.default_rng(index)
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            for _ in range(requests):
+                row = {"Age": int(rng.integers(20, 70)), "BMI": int(rng.integers(18, 32)), "Duration": int(rng.integers(5, 30)),
+                       "Heart_Rate": int(rng.integers(80, 120)), "Body_Temp": float(rng.integers(38, 41)),
+                       "Gender": "male" if rng.random() < 0.5 else "female"}
+                start = time.perf_counter()
+                status, _ = request(connection, "POST", "/predict", row)
+                latencies[index].append(time.perf_counter() - start)
+                if status != 200:
+                    failures.append(status)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        stats = request(http.client.HTTPConnection("127.0.0.1", port), "GET", "/stats")[1]
+        all_latencies = np.concatenate([np.array(values) for values in latencies]) * 1000
+        return {
+            "window_ms": window_ms,
+            "requests": len(all_latencies),
+            "failures": len(failures),
+            "requests_per_sec": round(len(all_latencies) / elapsed, 1),
+            "p50_ms": round(float(np.percentile(all_latencies, 50)), 2),
+            "p99_ms": round(float(np.percentile(all_latencies, 99)), 2),
+            "avg_batch_size": round(stats["avg_batch_size"], 1),
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 2], help="batching windows in ms (0 = off)")
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    for window in args.windows:
+        result = run(window, args.clients, args.requests, args.port)
+        print(" ".join(f"{name}={value}" for name, value in result.items()), flush=True)
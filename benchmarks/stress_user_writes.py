@@ -0,0 +1,75 @@
+# Stress test for concurrent user writes.
+#
+# N threads each register their own users and repeatedly append to a field of one
+# shared record, all through the commit queue. Every registration and every append
+# must survive; the script exits non-zero if any update was lost.
+#
+#   python -m benchmarks.stress_user_writes --threads 32 --ops 50 --backend sqlite
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import user_store
+
+SHARED_USER = "shared"
+
+
+def run(threads, ops, backend):
+    with tempfile.TemporaryDirectory() as folder:
+        if backend == "excel":
+            store = user_store.ExcelUserStore(os.path.join(folder, "users.xlsx"))
+        else:
+            store = user_store.SQLiteUserStore(os.path.join(folder, "users.db"))
+        store.save_all({SHARED_USER: {field: "#" for field in user_store.FIELDS}})
+        commit_queue = user_store.CommitQueue(store, os.path.join(folder, "users.lock"))
+
+        def append_mark(mark):
+            def mutate(current):
+                updated = dict(current, Name=str(current["Name"]) + mark)
+                return updated, True
+            return mutate
+
+        def register(current):
+            return (None, False) if current is not None else ({field: "x" for field in user_store.FIELDS}, True)
+
+        def worker(index):
+            for op in range(ops):
+                commit_queue.apply(f"user_{index}_{op}", register)
+                commit_queue.apply(SHARED_USER, append_mark("."))
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        users = store.load_all()
+        registered = len(users) - 1
+        appended = len(str(users[SHARED_USER]["Name"])) - 1
+        expected = threads * ops
+        stats = commit_queue.stats()
+
+        print(f"backend={backend} threads={threads} ops/thread={ops}")
+        print(f"registered {registered}/{expected}, shared record updates {appended}/{expected}")
+        print(f"{stats['mutations']} mutations in {stats['commits']} commits "
+              f"(avg batch {stats['avg_batch_size']:.1f}), {stats['mutations'] / elapsed:.0f} mutations/s")
+        print(f"latency avg {stats['avg_latency'] * 1000:.2f} ms, max {stats['max_latency'] * 1000:.2f} ms")
+        return registered == expected and appended == expected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--backend", choices=["sqlite", "excel"], default="sqlite")
+    args = parser.parse_args()
+    if not run(args.threads, args.ops, args.backend):
+        print("FAILED: updates were lost")
+        sys.exit(1)
+    print("OK: no updates lost")
@@ -0,0 +1,276 @@
+# Benchmark suite: the app's hot paths on synthetic data at several scales, with the
+# results written to a JSON file so runs of different versions can be compared.
+#
+# Data comes from benchmarks.synthetic, in a temporary folder. For each session count
+# (exercise.csv/calories.csv rows) it times:
+#   - csv_load_merge: dataset.build_exercise_df (read, merge, BMI, downcast)
+#   - forest_fit / forest_predict_batch / forest_predict_row: model_backends.train with a
+#     RandomForestRegressor, then predictions on encoded rows
+#   - similar_index_build / similar_calories / similar_profile: the "Similar Results" section
+#   - percentile_index_build / general_information: the "General Information" comparisons
+# and for each member count and user store backend:
+#   - save_users / load_users: the store's save_all / load_all (what save_users/load_users did)
+#   - user_cache_lookup: a lookup through user_store.UserCache (what load_users returns now)
+#   - attendance_ledger_open / mark_attendance: on a synthetic history of --days days
+#
+# Forests are fitted on at most --fit-max-rows sessions with --trees trees (the app uses
+# 1000), so the largest scales finish in minutes; both are recorded with the results.
+#
+#   python -m benchmarks.suite [--rows 15000 1000000] [--users 1000 100000] [--out FILE]
+#   python -m benchmarks.suite --rows 10000000 --users 1000000 --backends sqlite
+#   python -m benchmarks.suite --compare OLD.json NEW.json [--threshold 1.2]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from benchmarks import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join("metrics", "benchmarks")
+
+# Fields that identify one measurement across runs (everything else is a result)
+KEY_FIELDS = ["benchmark", "backend", "rows", "users"]
+
+
+class Suite:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    # Function to time fn (median of `repeat` calls, after one warm-up call if warm) and record it
+    def time(self, benchmark, fn, repeat=None, warm=False, **fields):
+        repeat = repeat or self.repeat
+        if warm:
+            fn()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return self.add(benchmark, statistics.median(timings), repeat=repeat, **fields)
+
+    def add(self, benchmark, seconds, **fields):
+        entry = {"benchmark": benchmark, **fields, "seconds": seconds}
+        self.results.append(entry)
+        where = " ".join(f"{key}={fields[key]}" for key in KEY_FIELDS[1:] if key in fields)
+        print(f"{benchmark:24} {where:30} {format_seconds(seconds):>12}", flush=True)
+        return entry
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+# Function to time loading, modelling and the comparison sections on `rows` synthetic sessions
+def run_sessions(suite, folder, rows, args):
+    import dataset
+    import model_backends
+    import percentiles
+    import similarity
+
+    start = time.perf_counter()
+    exercise_file, calories_file = synthetic.write_exercise_csvs(folder, rows, seed=args.seed)
+    print(f"generated {rows} sessions in {time.perf_counter() - start:.1f} s", flush=True)
+
+    exercise_df = None
+
+    def load():
+        nonlocal exercise_df
+        exercise_df = dataset.build_exercise_df(exercise_file, calories_file)
+
+    suite.time("csv_load_merge", load, repeat=1 if rows > 1_000_000 else None, rows=rows)
+
+    fit_df = exercise_df.sample(args.fit_max_rows, random_state=args.seed) if rows > args.fit_max_rows else exercise_df
+    config = {"backend": "forest", "n_estimators": args.trees}
+    start = time.perf_counter()
+    model = model_backends.train(config, fit_df)
+    suite.add("forest_fit", time.perf_counter() - start, rows=rows, fit_rows=len(fit_df), trees=args.trees)
+
+    sample = exercise_df.sample(min(rows, 100_000), random_state=args.seed + 1)
+    X = model_backends.encoded_frame(model.feature_encoder_, sample[model_backends.TRAINING_COLUMNS])
+    suite.time("forest_predict_batch", lambda: model.predict(X), repeat=3,
+               rows=rows, batch_rows=len(X), trees=args.trees)
+    one_row = X.iloc[:1]
+    suite.time("forest_predict_row", lambda: model.predict(one_row), warm=True, rows=rows, trees=args.trees)
+
+    # Similar Results: index build once per dataset, then one query per rerun
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    similarity_index = similarity.SimilarityIndex(exercise_df)
+    suite.add("similar_index_build", time.perf_counter() - start, rows=rows)
+    calories = iter(rng.uniform(1, 300, size=args.queries * 2))
+    suite.time("similar_calories", lambda: similarity_index.similar_calories(next(calories), k=5),
+               repeat=args.queries, warm=True, rows=rows)
+    profiles = iter(sample[similarity.PROFILE_FEATURES[:-1]].assign(Gender_male=(sample["Gender"] == "male").astype(int))
+                    .to_dict("records") * 2)
+    suite.time("similar_profile", lambda: similarity_index.similar_profile(next(profiles), k=5),
+               repeat=min(args.queries, len(sample)), warm=True, rows=rows)
+
+    # General Information: index build once per dataset, then the five comparisons per rerun
+    start = time.perf_counter()
+    percentile_index = percentiles.PercentileIndex(exercise_df)
+    suite.add("percentile_index_build", time.perf_counter() - start, rows=rows)
+    queries = iter(sample[percentiles.DEFAULT_COLUMNS].to_dict("records") * 2)
+    suite.time("general_information", lambda: percentile_index.share_below_many(next(queries)),
+               repeat=min(args.queries, len(sample)), warm=True, rows=rows)
+
+    for path in (exercise_file, calories_file):
+        os.remove(path)
+
+
+# Function to time the user store and attendance paths for `users` synthetic members
+def run_users(suite, folder, users, backend, args):
+    import attendance
+    import user_store
+
+    if backend == "excel":
+        store = user_store.ExcelUserStore(os.path.join(folder, f"users-{users}.xlsx"))
+    else:
+        store = user_store.SQLiteUserStore(os.path.join(folder, f"users-{users}.db"))
+    members = synthetic.synthetic_users(users)
+    slow = backend == "excel" or users > 100_000
+    suite.time("save_users", lambda: store.save_all(members), repeat=1 if slow else None, backend=backend, users=users)
+    suite.time("load_users", store.load_all, repeat=1 if slow else None, backend=backend, users=users)
+
+    cache = user_store.UserCache(store)
+    names = iter([f"member{i}" for i in np.random.default_rng(args.seed).integers(0, users, args.queries * 2)])
+    suite.time("user_cache_lookup", lambda: cache.get(next(names)), repeat=args.queries, warm=True,
+               backend=backend, users=users)
+
+    # Attendance: a history of --days days, opened by a fresh ledger (replay and compaction)
+    log_path = os.path.join(folder, f"attendance-{backend}-{users}.csv")
+    visits = synthetic.write_attendance(log_path, users, args.days, seed=args.seed)
+    start = time.perf_counter()
+    ledger = attendance.AttendanceLedger(log_path, log_path + ".snapshot.json")
+    suite.add("attendance_ledger_open", time.perf_counter() - start, backend=backend, users=users, visits=visits)
+
+    # The app's mark_attendance: a Last_Attendance commit through the queue, then the ledger
+    queue = user_store.CommitQueue(store, os.path.join(folder, "users.lock"))
+    today = str(date.today())
+
+    def attend(current):
+        if current is None or current["Last_Attendance"] == today:
+            return None, False
+        return dict(current, Last_Attendance=today), True
+
+    marking = iter(f"member{i}" for i in range(users))
+
+    def mark_attendance():
+        username = next(marking)
+        if queue.apply(username, attend):
+            ledger.record(username)
+
+    # Each Excel commit rewrites the whole workbook, so time only a few there
+    marks = min(users, 5 if backend == "excel" else args.queries)
+    suite.time("mark_attendance", mark_attendance, repeat=marks, backend=backend, users=users, visits=visits)
+
+
+# Function to describe the code and machine the results came from
+def environment():
+    try:
+        version = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        version = None
+    import pandas
+    import sklearn
+
+    return {"version": version, "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "packages": {"numpy": np.__version__, "pandas": pandas.__version__, "scikit-learn": sklearn.__version__}}
+
+
+# Function to match two result files by KEY_FIELDS and print new/old time ratios.
+# Returns the measurements that got slower by more than `threshold`.
+def compare(old_path, new_path, threshold):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def key(entry):
+        return tuple(entry.get(field) for field in KEY_FIELDS)
+
+    baseline = {key(entry): entry for entry in old["results"]}
+    regressions = []
+    print(f"{old['environment']['version']} -> {new['environment']['version']}")
+    for entry in new["results"]:
+        before = baseline.get(key(entry))
+        if before is None:
+            continue
+        ratio = entry["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        flag = "  SLOWER" if ratio > threshold else "  faster" if ratio < 1 / threshold else ""
+        where = " ".join(f"{field}={entry[field]}" for field in KEY_FIELDS[1:] if entry.get(field) is not None)
+        print(f"{entry['benchmark']:24} {where:30} {format_seconds(before['seconds']):>12} -> "
+              f"{format_seconds(entry['seconds']):>12}  x{ratio:.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(entry)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="*", default=[15_000, 1_000_000], help="session counts")
+    parser.add_argument("--users", type=int, nargs="*", default=[1_000, 100_000], help="member counts")
+    parser.add_argument("--backends", nargs="+", choices=["sqlite", "excel"], default=["sqlite", "excel"])
+    parser.add_argument("--excel-max-users", type=int, default=100_000,
+                        help="skip the Excel store above this many members (a 1M-row workbook takes many minutes)")
+    parser.add_argument("--days", type=int, default=90, help="attendance history length")
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--fit-max-rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200, help="timed calls for per-rerun lookups")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help=f"results file (default: {RESULTS_DIR}/suite-<time>-<version>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        print(f"{len(regressions)} regression(s) over x{args.threshold}")
+        sys.exit(1 if regressions else 0)
+
+    import instrumentation
+
+    suite = Suite(args.repeat)
+    env = environment()
+    with tempfile.TemporaryDirectory() as folder:
+        # Keep the synthetic runs' stage timings out of the app's metrics file
+        instrumentation.METRICS_FILE = os.path.join(folder, "stage_timings.jsonl")
+        for rows in args.rows:
+            run_sessions(suite, folder, rows, args)
+        for users in args.users:
+            for backend in args.backends:
+                if backend == "excel" and users > args.excel_max_users:
+                    print(f"skipping the Excel store for {users} members (over --excel-max-users)", flush=True)
+                    continue
+                run_users(suite, folder, users, backend, args)
+
+    env["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    out = args.out or os.path.join(RESULTS_DIR, f"suite-{datetime.now():%Y%m%d-%H%M%S}-{env['version'] or 'unknown'}.json")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"environment": env, "config": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+                   "results": suite.results}, f, indent=1)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Synthetic data at any scale, shaped like the app's real files.
+#
+# - exercise.csv / calories.csv: one session per User_ID with the real columns and value
+#   ranges; Heart_Rate and Body_Temp rise with Duration, and Calories follow a heart-rate
+#   energy equation (by gender, weight and age) with noise, so models have a signal to learn.
+# - Members: user_store records (the users.xlsx columns) for any member count, written as
+#   users.db (SQLite) and, up to --excel-max-users members, as users.xlsx.
+# - Attendance: a Username,Date log with each member visiting on a random share of days.
+#
+# Everything is generated in chunks from a seed, so 10M-row files don't need 10M rows in
+# memory and a rerun produces the same files.
+#
+#   python -m benchmarks.synthetic OUT_FOLDER [--rows 1000000] [--users 100000] [--days 90]
+#                                             [--excel-max-users 100000]
+
+import argparse
+import csv
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+CHUNK_USERS = 100_000
+
+# Above this many members users.xlsx is not written (a 1M-row workbook takes many minutes)
+EXCEL_MAX_USERS = 100_000
+
+
+# Function to generate one session per user id as (exercise, calories) frames
+def exercise_chunk(rng, user_ids):
+    rows = len(user_ids)
+    male = rng.random(rows) < 0.5
+    age = rng.integers(20, 80, size=rows)
+    height = np.clip(np.where(male, rng.normal(185, 9, rows), rng.normal(164, 9, rows)), 123, 222).round()
+    bmi = np.clip(rng.normal(24.5, 1.6, rows), 18, 30)
+    weight = np.clip(bmi * (height / 100) ** 2, 36, 132).round()
+    duration = rng.integers(1, 31, size=rows).astype(np.float64)
+    heart_rate = np.clip(75 + 1.3 * duration + rng.normal(0, 5, rows), 67, 128).round()
+    body_temp = np.clip(37.3 + 0.26 * duration - 0.0055 * duration ** 2 + rng.normal(0, 0.3, rows), 37.1, 41.5).round(1)
+
+    # kJ/min from heart rate, weight and age (by gender), converted to kcal for the session
+    per_minute = np.where(male,
+                          -55.0969 + 0.6309 * heart_rate + 0.1988 * weight + 0.2017 * age,
+                          -20.4022 + 0.4472 * heart_rate - 0.1263 * weight + 0.074 * age) / 4.184
+    calories = np.clip(per_minute * duration * rng.normal(1, 0.05, rows), 1, None).round()
+
+    exercise = pd.DataFrame({"User_ID": user_ids, "Gender": np.where(male, "male", "female"), "Age": age,
+                             "Height": height, "Weight": weight, "Duration": duration,
+                             "Heart_Rate": heart_rate, "Body_Temp": body_temp})
+    return exercise, pd.DataFrame({"User_ID": user_ids, "Calories": calories})
+
+
+# Function to write exercise.csv and calories.csv with `rows` sessions into folder
+def write_exercise_csvs(folder, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    rng = np.random.default_rng(seed)
+    # Unique ids (8 digits like the real files up to 90M rows): one per stride, in random order
+    stride = max(1, 90_000_000 // rows)
+    user_ids = rng.permutation(10_000_000 + np.arange(rows, dtype=np.int64) * stride + rng.integers(0, stride, rows))
+    exercise_file = os.path.join(folder, "exercise.csv")
+    calories_file = os.path.join(folder, "calories.csv")
+    for start in range(0, rows, chunk_rows):
+        exercise, calories = exercise_chunk(rng, user_ids[start:start + chunk_rows])
+        mode = "w" if start == 0 else "a"
+        exercise.to_csv(exercise_file, mode=mode, header=start == 0, index=False)
+        # Calories come in a different order than the sessions, so the merge has to match ids
+        calories.sample(frac=1, random_state=seed + start).to_csv(calories_file, mode=mode, header=start == 0, index=False)
+    return exercise_file, calories_file
+
+
+# Function to generate `count` member records (member<start> onwards) in the user_store format
+def synthetic_users(count, last_attendance=None, start=0):
+    return {f"member{i}": {"Password": f"{i:064x}", "Name": f"Member {i}", "DOB": "1990-01-01",
+                           "Security_Question": "Where do you live?", "Security_Answer": f"{i:064x}",
+                           "Last_Attendance": last_attendance} for i in range(start, start + count)}
+
+
+# Function to write `count` members into folder as users.db, and as users.xlsx when there
+# are at most excel_max_users of them. Returns the paths written.
+def write_users(folder, count, excel_max_users=EXCEL_MAX_USERS):
+    import user_store
+
+    sqlite_path = os.path.join(folder, "users.db")
+    for path in (sqlite_path, sqlite_path + "-wal", sqlite_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    store = user_store.SQLiteUserStore(sqlite_path)
+    for start in range(0, count, CHUNK_USERS):  # in chunks, so 1M members never sit in memory at once
+        store.save_all(synthetic_users(min(CHUNK_USERS, count - start), start=start))
+    paths = [sqlite_path]
+    if count <= excel_max_users:
+        excel_path = os.path.join(folder, "users.xlsx")
+        user_store.ExcelUserStore(excel_path).save_all(synthetic_users(count))
+        paths.append(excel_path)
+    return paths
+
+
+# Function to write an attendance log (Username,Date) covering the `days` days before `end`.
+# Each member visits on about `visit_rate` of the days. Returns the number of visits written.
+def write_attendance(path, users, days=90, visit_rate=0.4, end=None, seed=0):
+    rng = np.random.default_rng(seed)
+    end = end or date.today() - timedelta(days=1)
+    visits = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["Username", "Date"])
+        # Day by day, in the order the app appends them
+        for offset in range(days - 1, -1, -1):
+            day_name = (end - timedelta(days=offset)).isoformat()
+            members = np.flatnonzero(rng.random(users) < visit_rate)
+            writer.writerows((f"member{member}", day_name) for member in members)
+            visits += len(members)
+    return visits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("out", help="folder to write exercise.csv, calories.csv, the members and attendance.csv into")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--excel-max-users", type=int, default=EXCEL_MAX_USERS,
+                        help="also write users.xlsx up to this many members")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    print("Wrote", *write_exercise_csvs(args.out, args.rows, args.seed))
+    print(f"Wrote {args.users} members to", *write_users(args.out, args.users, args.excel_max_users))
+    visits = write_attendance(os.path.join(args.out, "attendance.csv"), args.users, args.days, seed=args.seed)
+    print(f"Wrote {visits} visits for {args.users} members to {os.path.join(args.out, 'attendance.csv')}")
@@ -0,0 +1,73 @@
+# Per-rerun cost of getting the logged-in user's record, for synthetic user stores.
+#
+# Compares what each script rerun used to do (load every user from the store) with a
+# lookup through the process-wide UserCache: in steady state, and right after another
+# session committed a change (so the cache has to revalidate).
+#
+#   python -m benchmarks.user_cache [--users 10000 100000] [--backends sqlite excel] [--reruns 200]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import user_store
+from benchmarks.synthetic import synthetic_users
+
+
+def per_call_ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(backend, count, reruns):
+    with tempfile.TemporaryDirectory() as folder:
+        if backend == "excel":
+            store = user_store.ExcelUserStore(os.path.join(folder, "users.xlsx"))
+        else:
+            store = user_store.SQLiteUserStore(os.path.join(folder, "users.db"))
+        store.save_all(synthetic_users(count))
+        commit_queue = user_store.CommitQueue(store, os.path.join(folder, "users.lock"))
+        cache = user_store.UserCache(store)
+        usernames = [f"member{random.randrange(count)}" for _ in range(reruns)]
+
+        def check_login(users, username):
+            return username in users and users[username]["Password"] is not None
+
+        # Full reloads are slow for big Excel files, so time fewer of them
+        full_repeat = max(1, min(reruns, 20 if backend == "sqlite" else 2))
+        full_ms = per_call_ms(lambda: check_login(store.load_all(), usernames[0]), full_repeat)
+
+        for username in usernames:  # warm the cache with the members that log in
+            check_login(cache, username)
+        names = iter(usernames * 2)
+        cached_ms = per_call_ms(lambda: check_login(cache, next(names)), reruns)
+
+        # Another session marks attendance, then this session reruns
+        def after_change():
+            commit_queue.apply("member0", lambda current: (dict(current, Last_Attendance=str(time.time_ns())), True))
+            time.sleep(0.002)  # let the Excel file's mtime move on
+            start = time.perf_counter()
+            check_login(cache, usernames[0])
+            return time.perf_counter() - start
+
+        changed_ms = sum(after_change() for _ in range(full_repeat)) / full_repeat * 1000
+        stats = cache.stats()
+        print(f"{backend:6} users={count:7d}  load all: {full_ms:8.3f} ms  cached lookup: {cached_ms:.4f} ms  "
+              f"after a change: {changed_ms:8.3f} ms  (hit rate {stats['hit_rate'] * 100:.1f}%, "
+              f"{stats['invalidations']} invalidations, {stats['reloads']} full reloads)", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", choices=["sqlite", "excel"], default=["sqlite", "excel"])
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        for count in args.users:
+            run(backend, count, args.reruns)
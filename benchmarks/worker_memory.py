@@ -0,0 +1,97 @@
+# Per-worker memory with private vs shared model and dataset.
+#
+# Starts N worker processes that each load the calorie forest and exercise_df and predict
+# a few rows, then measures every worker while all of them are alive:
+#   private  each worker unpickles the sklearn forest and builds exercise_df from the CSVs
+#   shared   each worker memory-maps the published forest arrays and the columnar snapshot
+# RSS counts shared pages in full in every process; PSS splits them between the processes
+# mapping them, so PSS is the per-worker cost that adds up to the machine's total.
+#
+#   python -m benchmarks.worker_memory [--workers 4]
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def memory_mb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0][:-1].lower()] = int(parts[1]) / 1024
+    return values
+
+
+def worker(mode):
+    import dataset
+    import model_store
+    import scoring
+
+    key = model_store.model_key()
+    if mode == "private":
+        import joblib
+
+        model = joblib.load(os.path.join(model_store.MODEL_DIR, key + ".joblib"))
+        exercise_df = dataset.build_exercise_df()
+    else:
+        import forest_export
+
+        model = forest_export.NumpyForest.attach(model_store.shared_forest_path(key))
+        exercise_df = dataset.ingest()
+
+    scoring.predict_batch(model, exercise_df.sample(200, random_state=0))
+    # Touch every dataset column, as the percentile and similarity indexes do
+    for column in exercise_df.columns:
+        if column == "Gender":
+            exercise_df[column].value_counts()
+        else:
+            exercise_df[column].to_numpy().sum()
+
+    print("ready", flush=True)
+    sys.stdin.read()
+
+
+def run(mode, workers):
+    processes = [subprocess.Popen([sys.executable, "-m", "benchmarks.worker_memory", "--worker", mode], cwd=ROOT,
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+    try:
+        for process in processes:
+            if process.stdout.readline().strip() != "ready":
+                raise RuntimeError(f"A {mode} worker failed to start")
+        measurements = [memory_mb(process.pid) for process in processes]
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+    rss = sum(m["rss"] for m in measurements) / workers
+    pss = sum(m["pss"] for m in measurements) / workers
+    print(f"{mode:8} workers={workers} avg RSS {rss:.1f} MB, avg PSS {pss:.1f} MB, total PSS {pss * workers:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", choices=["private", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+    else:
+        import dataset
+        import forest_export
+        import model_store
+        import scoring
+
+        # Make sure the model, its shared arrays and the dataset snapshot exist
+        model = scoring.load_model()
+        forest_export.publish_forest(model, model_store.shared_forest_path(model_store.model_key()))
+        dataset.ingest()
+        del model
+
+        for mode in ("private", "shared"):
+            run(mode, args.workers)
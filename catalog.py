@@ -0,0 +1,167 @@
+import bisect
+import heapq
+import json
+import os
+import re
+import threading
+
+# Folder with one JSON file per catalog, keyed by catalog name
+CATALOG_DIR = "catalog"
+CATALOG_FILES = {
+    "foods": "foods.json",                      # category -> food -> {Calories, Protein, Fat, Vitamins}
+    "juices": "juices.json",                    # category -> juice -> description
+    "equipment": "equipment.json",              # category -> equipment -> weight range
+    "age_guide": "age_guide.json",              # age group -> advice
+    "workouts": "workouts.json",                # workout type -> [exercise, ...]
+    "exercise_styles": "exercise_styles.json",  # category -> style -> description
+}
+
+# How each catalog is labelled in search results
+LABELS = {
+    "foods": "Food",
+    "juices": "Juice",
+    "equipment": "Equipment",
+    "age_guide": "Age guide",
+    "workouts": "Workout",
+    "exercise_styles": "Exercise style",
+}
+
+# Prefixes up to this length are precomputed; longer ones are answered from the sorted vocabulary
+MAX_PREFIX = 8
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+# Function to turn a catalog's nested data into flat search entries
+# (catalog, category, name, detail, keywords). detail is what the results show; keywords is
+# the searchable part of it, so a food is found by its vitamins but not by its nutrient
+# labels and values ("fat", "protein" or "165" would match nearly every food).
+def flatten(name, data):
+    entries = []
+    for category, items in data.items():
+        if isinstance(items, str):  # age_guide: the category is the entry
+            entries.append((name, "", category, items, items))
+        elif isinstance(items, list):  # workouts: category -> list of exercise names
+            entries.extend((name, category, item, "", "") for item in items)
+        else:
+            for item, detail in items.items():
+                if isinstance(detail, dict):  # foods: nutrients and vitamins
+                    keywords = " ".join(detail.get("Vitamins", []))
+                    detail = ", ".join(f"{key}: {', '.join(value) if isinstance(value, list) else value}"
+                                       for key, value in detail.items())
+                else:
+                    keywords = detail
+                entries.append((name, category, item, detail, keywords))
+    return entries
+
+
+# All catalogs plus an inverted index over every entry's name, category and keywords.
+#
+# Each token maps to the entries containing it, and every token prefix up to MAX_PREFIX
+# characters is indexed too, so a type-ahead query is a few dict lookups and a set
+# intersection no matter how large the catalogs grow.
+class Catalog:
+    def __init__(self, data):
+        self.data = data
+        self.entries = [entry for name in data for entry in flatten(name, data[name])]
+
+        # token -> set of entry ids, over all fields and over entry names only (for ranking)
+        self.postings, self.name_postings = {}, {}
+        for entry_id, (name, category, item, _, keywords) in enumerate(self.entries):
+            for token in set(tokenize(f"{LABELS.get(name, name)} {category} {item} {keywords}")):
+                self.postings.setdefault(token, set()).add(entry_id)
+            for token in set(tokenize(item)):
+                self.name_postings.setdefault(token, set()).add(entry_id)
+        self.vocabulary = sorted(self.postings)
+        self.name_vocabulary = sorted(self.name_postings)
+        self.prefixes = self._prefix_index(self.postings)
+        self.name_prefixes = self._prefix_index(self.name_postings)
+
+    @classmethod
+    def load(cls, folder=CATALOG_DIR):
+        data = {}
+        for name, filename in CATALOG_FILES.items():
+            with open(os.path.join(folder, filename), encoding="utf-8") as f:
+                data[name] = json.load(f)
+        return cls(data)
+
+    def __getattr__(self, name):
+        # catalog.foods, catalog.juices, ... give the nested data as the panels browse it
+        data = self.__dict__.get("data", {})
+        if name in data:
+            return data[name]
+        raise AttributeError(name)
+
+    @staticmethod
+    def _prefix_index(postings):
+        prefixes = {}  # prefix -> set of entry ids
+        for token, ids in postings.items():
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                prefixes.setdefault(token[:length], set()).update(ids)
+        return prefixes
+
+    # Function to get the ids of entries having a token that starts with prefix
+    def _matching(self, prefix, names_only=False):
+        prefixes, vocabulary, postings = (self.name_prefixes, self.name_vocabulary, self.name_postings) if names_only \
+            else (self.prefixes, self.vocabulary, self.postings)
+        if len(prefix) <= MAX_PREFIX:
+            return prefixes.get(prefix, set())
+        ids = set()
+        start = bisect.bisect_left(vocabulary, prefix)
+        for token in vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= postings[token]
+        return ids
+
+    @staticmethod
+    def _intersect(sets):
+        sets = sorted(sets, key=len)
+        ids = set(sets[0])
+        for other in sets[1:]:
+            ids &= other
+        return ids
+
+    # Function to find entries matching every word of the query (each word as a prefix).
+    # Entries whose own name matches every word rank first; otherwise catalog order is kept.
+    def search(self, query, limit=20):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        ids = self._intersect([self._matching(token) for token in tokens])
+        by_name = ids & self._intersect([self._matching(token, names_only=True) for token in tokens])
+        ranked = heapq.nsmallest(limit, by_name)
+        if len(ranked) < limit:
+            ranked += heapq.nsmallest(limit - len(ranked), ids - by_name)
+
+        results = []
+        for entry_id in ranked:
+            name, category, item, detail, _ = self.entries[entry_id]
+            results.append({"catalog": LABELS.get(name, name), "category": category, "name": item, "detail": detail})
+        return results
+
+
+_catalog = None
+_catalog_stat = None
+_lock = threading.Lock()
+
+
+# Function to get the mtime and size of the catalog files
+def catalog_stat(folder=CATALOG_DIR):
+    return tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size)
+                 for path in (os.path.join(folder, filename) for filename in CATALOG_FILES.values()))
+
+
+# Function to get the shared catalog, loading it on first use or when a catalog file changes
+def get_catalog():
+    global _catalog, _catalog_stat
+    with _lock:
+        stat = catalog_stat()
+        if _catalog is None or stat != _catalog_stat:
+            _catalog = Catalog.load()
+            _catalog_stat = stat
+    return _catalog
@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import snapshot
+
+# Training data files
+EXERCISE_FILE = "exercise.csv"
+CALORIES_FILE = "calories.csv"
+
+# One preprocessed exercise_df per server process, shared by every session.
+# Callers must treat it as read-only.
+_exercise_df = None
+_source_stat = None
+_lock = threading.Lock()
+
+memory_report = {"before_bytes": 0, "after_bytes": 0}
+
+
+# Function to shrink numeric columns to the smallest dtype that fits and make Gender categorical
+def downcast(df):
+    for column in df.columns:
+        if column == "Gender":
+            df[column] = df[column].astype("category")
+        elif pd.api.types.is_float_dtype(df[column]):
+            df[column] = df[column].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+# Function to read, merge and preprocess the training data
+def build_exercise_df(exercise_file=EXERCISE_FILE, calories_file=CALORIES_FILE):
+    with instrumentation.stage("csv_read"):
+        calories = pd.read_csv(calories_file)
+        exercise = pd.read_csv(exercise_file)
+
+    with instrumentation.stage("merge_feature_build"):
+        exercise_df = exercise.merge(calories, on="User_ID")
+        exercise_df.drop(columns="User_ID", inplace=True)
+
+        exercise_df["BMI"] = exercise_df["Weight"] / ((exercise_df["Height"] / 100) ** 2)
+        exercise_df["BMI"] = round(exercise_df["BMI"], 2)
+
+        memory_report["before_bytes"] = int(exercise_df.memory_usage(deep=True).sum())
+        exercise_df = downcast(exercise_df)
+        memory_report["after_bytes"] = int(exercise_df.memory_usage(deep=True).sum())
+    return exercise_df
+
+
+# Function to get the mtime and size of the source CSVs
+def source_stat():
+    return tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in (EXERCISE_FILE, CALORIES_FILE))
+
+
+# Function to load the training data from the columnar snapshot, rebuilding it if the CSVs changed
+def ingest(force=False):
+    sources = [EXERCISE_FILE, CALORIES_FILE]
+    manifest = snapshot.read_manifest()
+    if not force and snapshot.is_fresh(manifest, sources):
+        memory_report.update(manifest["extra"].get("memory_report", {}))
+        try:
+            with instrumentation.stage("snapshot_load"):
+                return snapshot.load_snapshot(manifest)
+        except FileNotFoundError:
+            pass  # Another worker replaced the snapshot after we read its manifest; rebuild below
+
+    exercise_df = build_exercise_df()
+    snapshot.write_snapshot(exercise_df, sources, extra={"memory_report": dict(memory_report)})
+    return exercise_df
+
+
+# Function to get the shared exercise_df, loading it on first use or when the CSVs change
+def load_exercise_df():
+    global _exercise_df, _source_stat
+    with _lock:
+        stat = source_stat()
+        if _exercise_df is None or stat != _source_stat:
+            _exercise_df = ingest()
+            _source_stat = stat
+    return _exercise_df
+
+
+if __name__ == "__main__":
+    # Ingest step: python dataset.py [--force]
+    exercise_df = ingest(force="--force" in sys.argv)
+    print(f"Snapshot ready in {snapshot.SNAPSHOT_DIR}/: {len(exercise_df)} rows, "
+          f"{memory_report['after_bytes']} bytes (was {memory_report['before_bytes']} before downcast)")
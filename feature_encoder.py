@@ -0,0 +1,129 @@
+# Fitted feature schema for the calorie model.
+#
+# A FeatureEncoder knows the model's input columns in order, which of them are one-hot
+# indicators of a category (drop_first, as pd.get_dummies(..., drop_first=True) made them),
+# and how to derive BMI from Weight/Height. It writes raw inputs straight into a float
+# array in the model's column order, so training, the UI, batch scoring and the prediction
+# service all encode the same way without building and reindexing DataFrames. Extra inputs
+# (e.g. Sleep_Time) are ignored. Only numpy is needed.
+
+import json
+
+import numpy as np
+
+# Raw columns that are one-hot encoded
+CATEGORICAL = ["Gender"]
+
+
+class FeatureEncoder:
+    # columns: model column order; one_hot: {column: (source column, category)}
+    def __init__(self, columns, one_hot=None):
+        self.columns = list(columns)
+        self.one_hot = {column: tuple(spec) for column, spec in (one_hot or {}).items()}
+        self.width = len(self.columns)
+
+    # Function to learn the schema from a raw training frame (target column excluded)
+    @classmethod
+    def fit(cls, frame, target="Calories", categorical=CATEGORICAL):
+        columns = [c for c in frame.columns if c != target and c not in categorical]
+        one_hot = {}
+        for source in categorical:
+            if source not in frame.columns:
+                continue
+            values = frame[source]
+            categories = values.cat.categories if hasattr(values, "cat") else np.unique(np.asarray(values).astype(str))
+            for category in sorted(str(c) for c in categories)[1:]:
+                one_hot[f"{source}_{category}"] = (source, category.lower())
+        return cls(columns + list(one_hot), one_hot)
+
+    # Function to rebuild the schema from a model's feature names (e.g. models trained before encoders)
+    @classmethod
+    def from_columns(cls, columns, categorical=CATEGORICAL):
+        one_hot = {}
+        for column in columns:
+            for source in categorical:
+                if column.startswith(source + "_"):
+                    one_hot[column] = (source, column[len(source) + 1:].lower())
+        return cls(columns, one_hot)
+
+    def to_dict(self):
+        return {"columns": self.columns, "one_hot": {column: list(spec) for column, spec in self.one_hot.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["columns"], data.get("one_hot"))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    # Function to encode one raw input mapping into a 1D float array (written into `out` if given)
+    def encode_row(self, inputs, out=None):
+        if out is None:
+            out = np.empty(self.width)
+        for j, column in enumerate(self.columns):
+            if column in inputs:
+                out[j] = inputs[column]
+            elif column in self.one_hot:
+                source, category = self.one_hot[column]
+                if source not in inputs:
+                    raise ValueError(f"Input is missing the '{column}' column")
+                out[j] = str(inputs[source]).lower() == category
+            elif column == "BMI" and "Weight" in inputs and "Height" in inputs:
+                out[j] = round(inputs["Weight"] / ((inputs["Height"] / 100) ** 2), 2)
+            else:
+                raise ValueError(f"Input is missing the '{column}' column")
+        return out
+
+    # Function to encode a list of raw input mappings into a 2D float array
+    def encode_records(self, records):
+        out = np.empty((len(records), self.width))
+        for i, inputs in enumerate(records):
+            self.encode_row(inputs, out[i])
+        return out
+
+    # Function to encode a DataFrame (or mapping of columns) into a 2D float array, column by column
+    def encode(self, frame, out=None):
+        rows = len(frame) if hasattr(frame, "columns") else len(next(iter(frame.values()), ()))
+        if out is None:
+            out = np.empty((rows, self.width), order="F")  # Each column is written contiguously
+        for j, column in enumerate(self.columns):
+            if column in frame:
+                out[:, j] = np.asarray(frame[column], dtype=np.float64)
+            elif column in self.one_hot:
+                source, category = self.one_hot[column]
+                if source not in frame:
+                    raise ValueError(f"Input is missing the '{column}' column")
+                out[:, j] = _matches(frame[source], category)
+            elif column == "BMI" and "Weight" in frame and "Height" in frame:
+                weight = np.asarray(frame["Weight"], dtype=np.float64)
+                height = np.asarray(frame["Height"], dtype=np.float64)
+                out[:, j] = np.round(weight / ((height / 100) ** 2), 2)
+            else:
+                raise ValueError(f"Input is missing the '{column}' column")
+        return out
+
+
+# Function to flag the values equal to a category, case-insensitively. Categorical columns
+# compare their few categories instead of every value.
+def _matches(values, category):
+    if hasattr(values, "cat"):
+        # One flag per category code; the extra last slot catches code -1 (missing)
+        table = np.array([str(name).lower() == category for name in values.cat.categories] + [False])
+        return table[values.cat.codes.to_numpy()]
+    values = np.asarray(values)
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    return np.array([str(name).lower() == category for name in uniques], dtype=bool)[inverse.ravel()]
+
+
+# Function to get the encoder a model was trained with
+def for_model(model):
+    encoder = getattr(model, "feature_encoder_", None)
+    if encoder is None:
+        encoder = FeatureEncoder.from_columns([str(c) for c in model.feature_names_in_])
+    return encoder
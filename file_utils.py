@@ -0,0 +1,46 @@
+# File helpers shared by the data, model and user stores: content hashes and a lock
+# file held across server processes. Standard library only, so importing it pulls in
+# none of the stores.
+
+import hashlib
+import os
+from contextlib import contextmanager
+
+# File digests, reused while a file's mtime and size stay the same
+_digests = {}
+
+
+# Function to hash a file's contents
+def file_digest(path):
+    info = os.stat(path)
+    cached = _digests.get(path)
+    if cached and cached[0] == (info.st_mtime_ns, info.st_size):
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _digests[path] = ((info.st_mtime_ns, info.st_size), digest.hexdigest())
+    return digest.hexdigest()
+
+
+# Function to hold an exclusive lock on a file shared by all server processes
+@contextmanager
+def file_lock(path):
+    with open(path, "a+") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,128 @@
+# Flattens a fitted RandomForestRegressor into packed NumPy arrays and evaluates them
+# without sklearn. Only numpy is imported here, so lightweight prediction workers can
+# load a forest exported by the app and predict without loading the ML stack.
+
+import os
+import shutil
+import sys
+
+import numpy as np
+
+# Rows evaluated together by NumpyForest.predict
+PREDICT_BLOCK = 1024
+
+
+# Function to pack every tree of a fitted forest into flat arrays.
+# Child indices are global (offset by each tree's start) and leaves point to themselves
+# with an infinite threshold, so evaluation is a fixed number of vectorized steps.
+def export_forest(model):
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        own_index = np.arange(tree.node_count) + offset
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, own_index, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own_index, tree.children_right + offset).astype(np.int32))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.array(roots, dtype=np.int32),
+        "max_depth": np.array(max_depth),
+        "feature_names": np.array(list(getattr(model, "feature_names_in_", []))),
+    }
+
+
+def save_forest(model, path):
+    np.savez(path, **export_forest(model))
+
+
+# Function to write the packed arrays as one .npy file each into a folder that worker
+# processes can memory-map. The folder is written under a temporary name and renamed,
+# so readers never see a partial forest.
+def publish_forest(model, folder):
+    if os.path.isdir(folder):
+        return folder
+    tmp_folder = f"{folder}.{os.getpid()}.tmp"
+    os.makedirs(tmp_folder, exist_ok=True)
+    for name, array in export_forest(model).items():
+        np.save(os.path.join(tmp_folder, f"{name}.npy"), array)
+    try:
+        os.rename(tmp_folder, folder)
+    except OSError:
+        # Another process published the same forest first
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+    return folder
+
+
+# Forest evaluator over the packed arrays
+class NumpyForest:
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.feature_names = [str(name) for name in arrays["feature_names"]]
+        self.feature_names_in_ = np.array(self.feature_names, dtype=object)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    # Function to open a folder written by publish_forest read-only and memory-mapped, so every
+    # process serving the same forest shares one copy of its arrays through the page cache
+    @classmethod
+    def attach(cls, folder):
+        arrays = {}
+        for name in ["feature", "threshold", "left", "right", "value", "roots", "max_depth", "feature_names"]:
+            arrays[name] = np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r")
+        return cls(arrays)
+
+    # Function to predict for one row or a batch. X is a 2D array (or 1D for one row) in
+    # feature_names order, or a DataFrame with those columns.
+    def predict(self, X):
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy()
+        # sklearn compares float32 inputs against float64 thresholds; do the same for parity
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32)).astype(np.float64)
+
+        # Rows are walked in blocks so the (rows x trees) node matrix stays small
+        predictions = np.empty(len(X))
+        for start in range(0, len(X), PREDICT_BLOCK):
+            block = X[start:start + PREDICT_BLOCK]
+            rows = np.arange(len(block))[:, None]
+            nodes = np.broadcast_to(self.roots, (len(block), len(self.roots)))
+            for _ in range(self.max_depth):
+                go_left = block[rows, self.feature[nodes]] <= self.threshold[nodes]
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            predictions[start:start + len(block)] = self.value[nodes].mean(axis=1)
+        return predictions
+
+
+if __name__ == "__main__":
+    # python forest_export.py [output.npz] exports the app's cached model
+    import model_store
+
+    model = model_store.get_model()
+    if model is None:
+        sys.exit("No trained model for the current data yet; open the fitness page once to train it.")
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(model_store.MODEL_DIR, f"{model_store.key_for(model)}.forest.npz")
+    save_forest(model, path)
+    print(f"Forest exported to {path}")
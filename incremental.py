@@ -0,0 +1,93 @@
+import copy
+import hashlib
+import os
+
+import pandas as pd
+
+import feature_encoder
+import model_backends
+from file_utils import file_digest
+
+# Trees replaced per incremental refresh; the oldest trees are retired as fresh ones arrive
+TREES_PER_REFRESH = 100
+
+# Old rows replayed alongside the new ones, as a multiple of the number of new rows,
+# so fresh trees still see the whole population and not only the latest sessions
+REPLAY_FACTOR = 4
+
+# Fall back to a full retrain once this share of the training rows arrived incrementally
+FULL_RETRAIN_SHARE = 0.5
+
+
+# Function to describe the source files a model was trained from
+def source_state(paths):
+    return {path: {"size": os.path.getsize(path), "sha256": file_digest(path)} for path in paths}
+
+
+# Function to tag a fitted model with the data it was built from
+def mark_trained(model, exercise_df, paths, full=True):
+    model.training_rows_ = len(exercise_df)
+    model.training_sources_ = source_state(paths)
+    if full:
+        model.full_training_rows_ = len(exercise_df)
+    return model
+
+
+# Function to check that the source files only grew by appending since the model was trained
+def appended_only(model, paths):
+    sources = getattr(model, "training_sources_", None)
+    if not sources or sorted(sources) != sorted(paths):
+        return False
+    for path in paths:
+        old = sources[path]
+        if os.path.getsize(path) < old["size"]:
+            return False
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            remaining = old["size"]
+            while remaining:
+                chunk = f.read(min(1 << 20, remaining))
+                if not chunk:
+                    return False
+                digest.update(chunk)
+                remaining -= len(chunk)
+        if digest.hexdigest() != old["sha256"]:
+            return False
+    return True
+
+
+# Function to check whether a model can be refreshed incrementally instead of retrained
+def can_refresh(model, exercise_df, paths):
+    if not hasattr(model, "estimators_") or not hasattr(model, "training_rows_"):
+        return False
+    if len(exercise_df) <= model.training_rows_:
+        return False
+    incremental_rows = len(exercise_df) - model.full_training_rows_
+    if incremental_rows > FULL_RETRAIN_SHARE * len(exercise_df):
+        return False
+    return appended_only(model, paths)
+
+
+# Function to fold rows appended after the model's watermark into a copy of the forest.
+# A small forest is trained on the new rows plus a replay sample of older rows, its trees
+# are appended, and the same number of the oldest trees are retired, keeping the size fixed.
+def refresh(model, exercise_df, config, trees=TREES_PER_REFRESH, replay_factor=REPLAY_FACTOR, random_state=None):
+    watermark = model.training_rows_
+    new_rows = exercise_df.iloc[watermark:]
+    old_rows = exercise_df.iloc[:watermark]
+    replay = old_rows.sample(min(len(old_rows), replay_factor * len(new_rows)), random_state=random_state)
+
+    frame = pd.concat([replay, new_rows])
+    X = model_backends.encoded_frame(feature_encoder.for_model(model), frame)
+    y = frame["Calories"]
+
+    trees = min(trees, len(model.estimators_))
+    fresh = model_backends.make_model(dict(config, n_estimators=trees)).fit(X, y)
+
+    # Shallow copy: the current model keeps serving its own tree list until it is swapped out
+    updated = copy.copy(model)
+    updated.estimators_ = model.estimators_[trees:] + fresh.estimators_
+    updated.n_estimators = len(updated.estimators_)
+    updated.training_rows_ = len(exercise_df)
+    updated.feature_encoder_ = feature_encoder.for_model(model)
+    return updated
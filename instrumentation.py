@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Where per-stage timings are appended, one JSON object per line
+METRICS_FILE = os.environ.get("STAGE_METRICS_FILE", os.path.join("metrics", "stage_timings.jsonl"))
+
+_write_lock = threading.Lock()
+
+
+# Function to append one stage timing to the metrics file
+def record(stage, seconds, **fields):
+    entry = {"ts": round(time.time(), 3), "stage": stage, "ms": round(seconds * 1000, 3), "pid": os.getpid()}
+    entry.update(fields)
+    with _write_lock:
+        folder = os.path.dirname(METRICS_FILE)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(METRICS_FILE, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+# Context manager that times a block and records it under the given stage name
+@contextmanager
+def stage(name, **fields):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, **fields)
+
+
+# Times the stages of one pipeline run and reports progress after each one,
+# e.g. to drive a Streamlit progress bar with the real stage names.
+class PipelineRun:
+    def __init__(self, stages, on_progress=None):
+        self.stages = list(stages)
+        self.on_progress = on_progress
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        if self.on_progress:
+            self.on_progress(len(self.timings) / len(self.stages), name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = elapsed
+            record(name, elapsed)
+            if self.on_progress:
+                self.on_progress(min(len(self.timings) / len(self.stages), 1.0), name)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+# Function to compute count, p50, p95 and max (in ms) per stage from the metrics file
+def summarize(path=METRICS_FILE):
+    samples = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            samples.setdefault(entry["stage"], []).append(entry["ms"])
+
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50": values[int(0.50 * (len(values) - 1))],
+            "p95": values[int(0.95 * (len(values) - 1))],
+            "max": values[-1],
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    # python instrumentation.py [metrics file]
+    summary = summarize(*sys.argv[1:2])
+    print(f"{'stage':<22}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}")
+    for name, row in sorted(summary.items()):
+        print(f"{name:<22}{row['count']:>8}{row['p50']:>12.2f}{row['p95']:>12.2f}{row['max']:>12.2f}")
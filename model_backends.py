@@ -0,0 +1,131 @@
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+from feature_encoder import FeatureEncoder
+
+# Columns the calorie model is trained on (Gender becomes Gender_male)
+TRAINING_COLUMNS = ["Gender", "Age", "BMI", "Duration", "Heart_Rate", "Body_Temp", "Calories"]
+
+# Candidates compared by the evaluation report
+CANDIDATES = [
+    {"backend": "forest", "n_estimators": 1000},
+    {"backend": "forest", "n_estimators": 100},
+    {"backend": "forest", "n_estimators": 30},
+    {"backend": "hist_gb"},
+    {"backend": "poly", "degree": 2},
+    {"backend": "poly", "degree": 1},
+]
+
+
+# Function to build an unfitted model for a backend config
+def make_model(config):
+    backend = config.get("backend", "forest")
+    if backend == "forest":
+        return RandomForestRegressor(n_estimators=config.get("n_estimators", 1000), max_features=config.get("max_features", 3),
+                                     max_depth=config.get("max_depth", 6), n_jobs=config.get("n_jobs"))
+    if backend == "hist_gb":
+        return HistGradientBoostingRegressor(max_iter=config.get("max_iter", 200), random_state=1)
+    if backend == "poly":
+        # Closed-form least squares on polynomial features (degree 1 is plain linear regression)
+        return make_pipeline(PolynomialFeatures(config.get("degree", 2), include_bias=False), LinearRegression())
+    raise ValueError(f"Unknown model backend '{backend}'")
+
+
+# Function to describe a backend config in one short label
+def label(config):
+    if config["backend"] == "forest":
+        return f"forest ({config.get('n_estimators', 1000)} trees)"
+    if config["backend"] == "poly":
+        return f"poly (degree {config.get('degree', 2)})"
+    return config["backend"]
+
+
+# Function to encode raw rows into a model input frame with the encoder's columns
+def encoded_frame(encoder, frame):
+    return pd.DataFrame(encoder.encode(frame), columns=encoder.columns, index=frame.index)
+
+
+# Function to split the shared exercise_df into the model's train and held-out test sets.
+# The feature encoder is fitted on the training rows and encodes both sets the same way.
+def training_frames(exercise_df, return_encoder=False):
+    train, test = train_test_split(exercise_df[TRAINING_COLUMNS], test_size=0.2, random_state=1)
+    encoder = FeatureEncoder.fit(train)
+    frames = encoded_frame(encoder, train), encoded_frame(encoder, test), train["Calories"], test["Calories"]
+    return (*frames, encoder) if return_encoder else frames
+
+
+# Function to fit a backend on the training split. Forests are grown in steps of
+# `progress_step` trees (warm start) so that progress(fraction) can be reported.
+def train(config, exercise_df, progress=None, progress_step=100):
+    X_train, _, y_train, _, encoder = training_frames(exercise_df, return_encoder=True)
+    model = make_model(config)
+    if progress is None or config.get("backend", "forest") != "forest":
+        model.fit(X_train, y_train)
+    else:
+        total = model.n_estimators
+        model.set_params(warm_start=True)
+        for trees in range(min(progress_step, total), total + progress_step, progress_step):
+            model.set_params(n_estimators=min(trees, total))
+            model.fit(X_train, y_train)
+            progress(model.n_estimators / total)
+        model.set_params(warm_start=False)
+    if progress is not None:
+        progress(1.0)
+    model.feature_encoder_ = encoder
+    return model
+
+
+# Function to fit and score each candidate on the held-out X_test/y_test
+def evaluate(candidates, exercise_df, repeat=20):
+    X_train, X_test, y_train, y_test = training_frames(exercise_df)
+    one_row = X_test.iloc[:1]
+    rows = []
+    for config in candidates:
+        model = make_model(config)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predictions = model.predict(X_test)
+        batch_time = time.perf_counter() - start
+
+        single = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            model.predict(one_row)
+            single.append(time.perf_counter() - start)
+
+        rows.append({
+            "model": label(config),
+            "mae_kcal": round(mean_absolute_error(y_test, predictions), 3),
+            "fit_s": round(fit_time, 3),
+            "predict_1_row_ms": round(float(np.median(single)) * 1000, 3),
+            "predict_per_row_us": round(batch_time / len(X_test) * 1e6, 3),
+            "size_kb": round(len(pickle.dumps(model)) / 1024, 1),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # python model_backends.py [--csv report.csv]
+    import dataset
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", help="also write the report to this CSV file")
+    args = parser.parse_args()
+
+    report = evaluate(CANDIDATES, dataset.load_exercise_df())
+    print(report.to_string(index=False))
+    if args.csv:
+        report.to_csv(args.csv, index=False)
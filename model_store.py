@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+
+import forest_export
+from file_utils import file_digest
+
+# Folder where fitted models are stored, one file per data + config hash
+MODEL_DIR = "model_cache"
+
+# Training data and model config the calorie model depends on
+DATA_FILES = ["exercise.csv", "calories.csv"]
+# The backend is chosen per deployment with MODEL_BACKEND (forest, hist_gb, poly) and MODEL_TREES
+MODEL_PARAMS = {
+    "backend": os.environ.get("MODEL_BACKEND", "forest"),
+    "n_estimators": int(os.environ.get("MODEL_TREES", 1000)),
+    "max_features": 3,
+    "max_depth": 6,
+}
+
+# Models already loaded in this process, keyed by their content hash
+_models = {}
+_training = {}
+_lock = threading.Lock()
+
+# Published forests attached from their shared arrays in this process (latest key only)
+_shared = {}
+
+stats = {"hits": 0, "misses": 0, "disk_loads": 0, "load_time": 0.0, "train_time": 0.0}
+
+
+# Function to build the cache key from the input files and hyperparameters
+def model_key(data_files=DATA_FILES, params=MODEL_PARAMS):
+    key = hashlib.sha256()
+    for path in data_files:
+        key.update(file_digest(path).encode())
+    key.update(json.dumps(params, sort_keys=True).encode())
+    return key.hexdigest()[:32]
+
+
+# Function to get the fitted model, training it only if the data or config changed.
+# Without a train_fn, returns None when no model has been trained for this data yet.
+# Training runs outside the lock, so sessions can keep using other loaded models meanwhile;
+# concurrent callers asking for the same model wait for the one training it.
+def get_model(train_fn=None, data_files=DATA_FILES, params=MODEL_PARAMS):
+    key = model_key(data_files, params)
+    while True:
+        with _lock:
+            if key in _models:
+                stats["hits"] += 1
+                return _models[key]
+
+            path = os.path.join(MODEL_DIR, key + ".joblib")
+            if os.path.exists(path):
+                start = time.perf_counter()
+                model = joblib.load(path)
+                stats["load_time"] += time.perf_counter() - start
+                stats["disk_loads"] += 1
+                _models[key] = model
+                return model
+
+            if train_fn is None:
+                return None
+            in_progress = _training.get(key)
+            if in_progress is None:
+                in_progress = _training[key] = threading.Event()
+                break
+
+        in_progress.wait()
+
+    try:
+        start = time.perf_counter()
+        model = train_fn(params)
+        train_time = time.perf_counter() - start
+
+        save_model(path, model)
+
+        with _lock:
+            stats["misses"] += 1
+            stats["train_time"] += train_time
+            _models[key] = model
+        return model
+    finally:
+        with _lock:
+            del _training[key]
+        in_progress.set()
+
+
+# Function to write a model file; a temporary file is renamed so other processes never see a partial model
+def save_model(path, model):
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+# Function to store a model built outside get_model (e.g. an incremental refresh) for the current data
+def put_model(model, data_files=DATA_FILES, params=MODEL_PARAMS):
+    key = model_key(data_files, params)
+    save_model(os.path.join(MODEL_DIR, key + ".joblib"), model)
+    with _lock:
+        _models[key] = model
+    return key
+
+
+# Function to get the cache key a loaded model was stored under
+def key_for(model):
+    with _lock:
+        for key, loaded in _models.items():
+            if loaded is model:
+                return key
+    return getattr(model, "model_key_", None)
+
+
+# Function to load a stored model by its key without keeping it in this process's cache
+def load_stored(key):
+    path = os.path.join(MODEL_DIR, key + ".joblib")
+    return joblib.load(path) if os.path.exists(path) else None
+
+
+# Function to drop a model from this process's cache (e.g. once it is served from shared memory)
+def release(key):
+    with _lock:
+        _models.pop(key, None)
+
+
+# Folder holding a forest's packed arrays, memory-mapped by every worker process
+def shared_forest_path(key):
+    return os.path.join(MODEL_DIR, key + ".forest")
+
+
+# Function to get the published forest for a key from its memory-mapped arrays, attaching
+# them on first use (counted as a disk load) and reusing the same object afterwards (a hit).
+# Returns None if no forest has been published for the key yet.
+def get_shared_forest(key):
+    with _lock:
+        forest = _shared.get(key)
+        if forest is not None:
+            stats["hits"] += 1
+            return forest
+        folder = shared_forest_path(key)
+        if not os.path.isdir(folder):
+            return None
+        start = time.perf_counter()
+        forest = forest_export.NumpyForest.attach(folder)
+        forest.model_key_ = key
+        stats["load_time"] += time.perf_counter() - start
+        stats["disk_loads"] += 1
+        _shared.clear()  # Sessions still on an older forest keep their own reference
+        _shared[key] = forest
+        return forest
+
+
+# Function to count a model served from memory by its owner (e.g. the trainer's current model)
+def record_hit():
+    with _lock:
+        stats["hits"] += 1
+
+
+# Function to get a copy of the cache counters
+def cache_stats():
+    with _lock:
+        return dict(stats, loaded_models=len(_models) + len(_shared))
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import dataset
+import forest_export
+import incremental
+import model_backends
+import model_store
+
+
+# Keeps a current model for the app and (re)builds it in a background thread.
+#
+# Sessions always get the model currently installed, even while a newer one is being
+# trained for changed data or config; the new model is swapped in with one assignment
+# once it is ready. Training uses every core (n_jobs=-1). When rows were only appended to
+# the CSVs, the forest is refreshed incrementally (see incremental.py) instead.
+#
+# Forests are served as packed arrays memory-mapped from model_cache/<key>.forest, so all
+# server processes share one copy; a process only loads the sklearn forest to build it.
+class ModelTrainer:
+    def __init__(self):
+        self._current = None  # (version, model), replaced atomically
+        self._thread = None
+        self._lock = threading.Lock()
+        self._status = {
+            "state": "idle",  # idle, loading, training, refreshing, ready or failed
+            "version": None,
+            "target_version": None,
+            "progress": 0.0,
+            "trained_at": None,
+            "build_seconds": None,
+            "error": None,
+        }
+
+    # Function to start building the model for the current data and config, unless already
+    # running, the current model is already for them, or a build for them already failed
+    # (so calling it on every rerun is cheap and a failing build isn't retried in a loop)
+    def start(self):
+        try:
+            latest = model_store.model_key()
+        except OSError:
+            latest = None  # Data files unreadable; a build would fail the same way until they change
+        current = self._current
+        if current is not None and current[0] == latest:
+            return
+        status = self.status()
+        if status["state"] == "failed" and status["target_version"] == latest:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="model-trainer", daemon=True)
+            self._thread.start()
+
+    def _set_status(self, **fields):
+        with self._lock:
+            self._status.update(fields)
+
+    def _run(self):
+        started = time.perf_counter()
+        version = None
+        try:
+            version = model_store.model_key()
+            exercise_df = dataset.load_exercise_df()
+            if self._current is not None and self._current[0] == version:
+                return  # Already serving this version; keep the same model object (and its caches)
+            self._set_status(state="loading", target_version=version, progress=0.0, error=None)
+
+            def train_fn(params):
+                self._set_status(state="training")
+                model = model_backends.train(dict(params, n_jobs=-1), exercise_df,
+                                             progress=lambda fraction: self._set_status(progress=fraction))
+                return incremental.mark_trained(model, exercise_df, model_store.DATA_FILES)
+
+            # Another process may already have built and published this version
+            model = self._attach(version)
+            if model is None:
+                model = model_store.get_model()
+            current = self._current
+            if model is None and current is not None and model_store.MODEL_PARAMS["backend"] == "forest":
+                # If rows were only appended since the current model, refresh it instead of retraining
+                previous = current[1] if hasattr(current[1], "estimators_") else model_store.load_stored(current[0])
+                if previous is not None and incremental.can_refresh(previous, exercise_df, model_store.DATA_FILES):
+                    self._set_status(state="refreshing")
+                    model = incremental.refresh(previous, exercise_df, dict(model_store.MODEL_PARAMS, n_jobs=-1))
+                    incremental.mark_trained(model, exercise_df, model_store.DATA_FILES, full=False)
+                    model_store.put_model(model)
+            if model is None:
+                model = model_store.get_model(train_fn)
+            if hasattr(model, "estimators_"):
+                forest_export.publish_forest(model, model_store.shared_forest_path(version))
+                model_store.release(version)
+                model = self._attach(version)
+            self._current = (version, model)
+            self._set_status(state="ready", version=version, progress=1.0, trained_at=time.time(),
+                             build_seconds=time.perf_counter() - started)
+        except Exception as error:
+            self._set_status(state="failed", target_version=version, error=str(error))
+
+    # Function to open the shared arrays of a published forest, or None if there are none yet
+    def _attach(self, version):
+        return model_store.get_shared_forest(version)
+
+    # Function to get the model to serve now (None only before the first one is ready).
+    # Starts a background rebuild when the data or config no longer match the current model.
+    def current_model(self):
+        current = self._current
+        try:
+            latest = model_store.model_key()
+        except OSError:
+            latest = None
+        if current is None or (latest is not None and current[0] != latest):
+            self.start()
+        if current is None:
+            return None
+        model_store.record_hit()
+        return current[1]
+
+    def is_busy(self):
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def status(self):
+        with self._lock:
+            return dict(self._status)
+
+
+_trainer = None
+_trainer_lock = threading.Lock()
+
+
+# Function to get the process-wide trainer
+def get_trainer():
+    global _trainer
+    with _trainer_lock:
+        if _trainer is None:
+            _trainer = ModelTrainer()
+    return _trainer
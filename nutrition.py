@@ -0,0 +1,132 @@
+# Meal and day nutrition totals over the food catalog.
+#
+# FoodTable packs catalog/foods.json into a matrix with one row per food and one column per
+# nutrient (Calories, Protein, Fat per 100 g), plus a vitamin bitmask per food. A meal is a
+# vector of grams per food, so its totals are one vector-matrix product; many members' days
+# are a sparse (days x foods) grams matrix times the same table.
+
+import threading
+
+import numpy as np
+
+import catalog
+
+NUTRIENTS = ["Calories", "Protein", "Fat"]
+
+# Nutrient values in the table are per this many grams
+PER_GRAMS = 100.0
+
+
+class FoodTable:
+    # foods: category -> food -> {Calories, Protein, Fat, Vitamins}
+    def __init__(self, foods):
+        self.names = []
+        self.categories = []
+        rows = []
+        food_vitamins = []
+        for category, items in foods.items():
+            for name, info in items.items():
+                self.names.append(name)
+                self.categories.append(category)
+                rows.append([float(info[nutrient]) for nutrient in NUTRIENTS])
+                food_vitamins.append(info.get("Vitamins", []))
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != len(self.names):
+            raise ValueError("Food names must be unique across categories")
+        self.matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(NUTRIENTS))
+
+        # One bit per vitamin/mineral, so a meal's vitamins are a bitwise OR of its foods'
+        self.vitamins = sorted({vitamin for names in food_vitamins for vitamin in names})
+        if len(self.vitamins) > 64:
+            raise ValueError("At most 64 distinct vitamins fit in the bitmask")
+        bit = {vitamin: np.uint64(1) << np.uint64(i) for i, vitamin in enumerate(self.vitamins)}
+        self.vitamin_bits = np.zeros(len(self.names), dtype=np.uint64)
+        for i, names in enumerate(food_vitamins):
+            for vitamin in names:
+                self.vitamin_bits[i] |= bit[vitamin]
+
+    @classmethod
+    def from_catalog(cls, source=None):
+        return cls((source or catalog.get_catalog()).foods)
+
+    # Function to turn (food, grams) pairs into food row indices and gram amounts
+    def _items(self, items):
+        try:
+            food_ids = np.array([self.index[food] for food, _ in items], dtype=np.intp)
+        except KeyError as error:
+            raise ValueError(f"Unknown food {error}") from None
+        grams = np.array([grams for _, grams in items], dtype=np.float64)
+        if (grams < 0).any():
+            raise ValueError("Food amounts must not be negative")
+        return food_ids, grams
+
+    # Function to get the vitamin names set in a bitmask
+    def vitamin_names(self, mask):
+        mask = int(mask)
+        return [vitamin for i, vitamin in enumerate(self.vitamins) if mask >> i & 1]
+
+    # Function to get a grams-per-food vector (one slot per food) for a list of (food, grams) pairs
+    def grams_vector(self, items):
+        food_ids, grams = self._items(items)
+        vector = np.zeros(len(self.names))
+        np.add.at(vector, food_ids, grams)
+        return vector
+
+    # Function to get the nutrients of each (food, grams) pair, one row per pair
+    def item_totals(self, items):
+        food_ids, grams = self._items(items)
+        return self.matrix[food_ids] * (grams / PER_GRAMS)[:, None]
+
+    # Function to total a meal or day given as (food, grams) pairs
+    def totals(self, items):
+        vector = self.grams_vector(items)
+        values = (vector / PER_GRAMS) @ self.matrix
+        mask = np.bitwise_or.reduce(self.vitamin_bits[vector > 0]) if (vector > 0).any() else 0
+        totals = dict(zip(NUTRIENTS, values.tolist()))
+        totals["Vitamins"] = self.vitamin_names(mask)
+        return totals
+
+    # Function to total many days at once from flat arrays: day_ids[i] ate grams[i] of food_ids[i].
+    # Returns a (days, nutrients) array and one vitamin bitmask per day.
+    def day_totals_arrays(self, day_ids, food_ids, grams, days):
+        from scipy import sparse
+
+        day_ids = np.asarray(day_ids, dtype=np.intp)
+        food_ids = np.asarray(food_ids, dtype=np.intp)
+        grams = np.asarray(grams, dtype=np.float64)
+        # Duplicate (day, food) pairs are summed when the sparse matrix is built
+        amounts = sparse.csr_matrix((grams / PER_GRAMS, (day_ids, food_ids)), shape=(days, len(self.names)))
+        values = amounts @ self.matrix
+
+        masks = np.zeros(days, dtype=np.uint64)
+        eaten = grams > 0
+        np.bitwise_or.at(masks, day_ids[eaten], self.vitamin_bits[food_ids[eaten]])
+        return values, masks
+
+    # Function to total many days at once, each a list of (food, grams) pairs
+    def day_totals(self, days):
+        sizes = [len(items) for items in days]
+        food_ids, grams = self._items([item for items in days for item in items])
+        day_ids = np.repeat(np.arange(len(days)), sizes)
+        return self.day_totals_arrays(day_ids, food_ids, grams, len(days))
+
+
+# Function to compare calories eaten with calories burned (positive net means a surplus)
+def energy_balance(intake, burned):
+    return {"intake": intake, "burned": burned, "net": intake - burned}
+
+
+_table = None
+_table_source = None
+_lock = threading.Lock()
+
+
+# Function to get the shared food table, rebuilt when the catalog is reloaded
+def get_food_table():
+    global _table, _table_source
+    source = catalog.get_catalog()
+    with _lock:
+        if _table is None or _table_source is not source:
+            _table = FoodTable.from_catalog(source)
+            _table_source = source
+    return _table
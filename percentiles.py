@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+# Columns used by the "General Information" comparisons
+DEFAULT_COLUMNS = ["Age", "Duration", "Heart_Rate", "Body_Temp", "BMI"]
+
+# Above this many rows a column is summarised by a quantile sketch instead of kept in full
+MAX_EXACT_ROWS = 5_000_000
+SKETCH_POINTS = 10_001
+
+
+# Answers "what share of people have a lower value than X" with a binary search
+# over each column's sorted values (or its quantile sketch for very large data).
+class PercentileIndex:
+    def __init__(self, df, columns=DEFAULT_COLUMNS, max_exact_rows=MAX_EXACT_ROWS):
+        self.rows = len(df)
+        self.sorted_values = {}
+        self.sketches = {}
+        for column in columns:
+            values = df[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values) > max_exact_rows:
+                grid = np.linspace(0, 1, SKETCH_POINTS)
+                self.sketches[column] = (np.quantile(values, grid), grid)
+            else:
+                self.sorted_values[column] = np.sort(values)
+
+    @property
+    def columns(self):
+        return list(self.sorted_values) + list(self.sketches)
+
+    # Function to get the fraction of rows strictly below each value (scalar or array)
+    def share_below(self, column, values):
+        values = np.asarray(values, dtype=np.float64)
+        if column in self.sorted_values:
+            sorted_values = self.sorted_values[column]
+            if len(sorted_values) == 0:
+                shares = np.zeros_like(values)
+            else:
+                shares = np.searchsorted(sorted_values, values, side="left") / len(sorted_values)
+        elif column in self.sketches:
+            quantiles, grid = self.sketches[column]
+            shares = np.interp(values, quantiles, grid, left=0.0, right=1.0)
+        else:
+            raise KeyError(f"No percentile index for column '{column}'")
+        return float(shares) if shares.ndim == 0 else shares
+
+    # Function to answer several columns at once, e.g. {"Age": 30, "BMI": [20, 25]}
+    def share_below_many(self, queries):
+        return {column: self.share_below(column, values) for column, values in queries.items()}
+
+
+_index = None
+_indexed_df = None
+_lock = threading.Lock()
+
+
+# Function to get the index for the shared exercise_df, rebuilding it when the data is reloaded
+def get_index(df, columns=DEFAULT_COLUMNS):
+    global _index, _indexed_df
+    with _lock:
+        if _indexed_df is not df or _index is None or not set(columns) <= set(_index.columns):
+            _index = PercentileIndex(df, columns)
+            _indexed_df = df
+    return _index
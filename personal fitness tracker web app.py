@@ -1,53 +1,25 @@
+import time
+render_started = time.perf_counter()
+
 import streamlit as st
 import hashlib
-import time
 from datetime import datetime, date, timedelta
-import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
 from hashlib import sha256
-
-# Path for the Excel file
-EXCEL_FILE = "users.xlsx"
-
+import user_store
+import attendance
+import instrumentation
+# pandas, sklearn and the training data are imported on the fitness page only (see below),
+# so the login page renders without loading the ML stack
+
+# Function to get the users: a process-wide read-through cache over the configured user store
+# that reloads only what changed (see user_store.UserCache)
 def load_users():
-    try:
-        # Load the Excel file
-        df = pd.read_excel(EXCEL_FILE)
-
-        # Ensure column names are stripped of whitespace
-        df.columns = df.columns.str.strip()
-
-        # Check if "Username" column exists
-        if "Username" not in df.columns:
-            raise KeyError("The 'Username' column is missing from the Excel file!")
-
-        return df.set_index("Username").to_dict(orient="index")
-
-    except (FileNotFoundError, KeyError):
-        # If file is missing or "Username" column is missing, create a new file
-        df = pd.DataFrame(columns=[
-            "Username", "Password", "Name", "DOB", 
-            "Security_Question", "Security_Answer", "Last_Attendance"
-        ])
-        df.to_excel(EXCEL_FILE, index=False)
-        return {}
-
-# Example usage
-users = load_users()
-print(users)  # Debugging: Print loaded users
+    return user_store.get_user_cache()
 
 
-# Function to save user data to Excel
+# Function to save user data to the user store
 def save_users(users_dict):
-    df = pd.DataFrame.from_dict(users_dict, orient="index").reset_index()
-    if len(df.columns) == 7:  # Ensure correct column count before renaming
-        df.columns = ["Username", "Password", "Name", "DOB", "Security_Question", "Security_Answer", "Last_Attendance"]
-    else:
-        print("Column mismatch! Found columns:", df.columns)  # Debugging step
-
-    df.to_excel(EXCEL_FILE, index=False)
+    user_store.get_store().save_all(users_dict)
 
 # Function to hash passwords
 def hash_password(password):
@@ -59,36 +31,58 @@ def check_login(username, password, users):
         return True
     return False
 
-# Function to add new users
+# Function to add new users.
+# Changes go through the user store's commit queue, which re-reads the stored record
+# before applying them, so concurrent sessions never overwrite each other.
 def add_user(username, password, name, dob, question, answer, users):
-    if username not in users:
-        users[username] = {
-            "Password": hash_password(password),
-            "Name": name,
-            "DOB": dob,
-            "Security_Question": question,
-            "Security_Answer": hash_password(answer),
-            "Last_Attendance": None
-        }
-        save_users(users)
+    record = {
+        "Password": hash_password(password),
+        "Name": name,
+        "DOB": dob,
+        "Security_Question": question,
+        "Security_Answer": hash_password(answer),
+        "Last_Attendance": None
+    }
+
+    def create(current):
+        if current is not None:
+            return None, False  # Username taken, possibly by another session
+        return record, True
+
+    if user_store.commit(username, create):
+        users[username] = record
+        return True
+    return False
 
 # Function to reset password
 def reset_password(username, question, answer, new_password, users):
-    if username in users:
-        if users[username]["Security_Question"] == question and users[username]["Security_Answer"] == hash_password(answer):
-            users[username]["Password"] = hash_password(new_password)
-            save_users(users)
-            return True
-    return False
+    def update_password(current):
+        if current is not None and current["Security_Question"] == question and current["Security_Answer"] == hash_password(answer):
+            updated = dict(current, Password=hash_password(new_password))
+            return updated, updated
+        return None, None
+
+    updated = user_store.commit(username, update_password)
+    if updated is None:
+        return False
+    users[username] = updated
+    return True
 
 # Function to mark attendance
 def mark_attendance(username, users):
     today = str(date.today())
-    if users[username]["Last_Attendance"] != today:
+
+    def attend(current):
+        if current is None or current["Last_Attendance"] == today:
+            return None, False  # Attendance already marked today
+        return dict(current, Last_Attendance=today), True
+
+    marked = user_store.commit(username, attend)
+    if marked:
+        attendance.get_ledger().record(username)  # Full history in attendance.csv
+    if username in users:
         users[username]["Last_Attendance"] = today
-        save_users(users)
-        return True  # Attendance marked successfully
-    return False  # Attendance already marked today
+    return marked
 
 # Initialize the app
 users = load_users()
@@ -160,10 +154,29 @@ if not st.session_state.login:
             elif username in users:
                 st.error("Username already exists!")
             else:
-                add_user(username, password, name, dob, question, answer, users)
-                st.success("Registration successful! Please login.")
+                if add_user(username, password, name, dob, question, answer, users):
+                    st.success("Registration successful! Please login.")
+                else:
+                    st.error("Username already exists!")
+
+    instrumentation.record("login_render", time.perf_counter() - render_started)
 
 else:
+    # Heavy modules load on the first visit to this page and stay imported for the process
+    import pandas as pd
+    import dataset
+    import model_store
+    import percentiles
+    import similarity
+    import feature_encoder
+    import catalog
+    import nutrition
+    import prediction_cache
+    import model_trainer
+
+    # Build (or load) the calorie model in the background while the member looks around
+    model_trainer.get_trainer().start()
+
     st.title("Personal Fitness Tracker")
     username = st.session_state.current_user
 
@@ -172,262 +185,48 @@ else:
             st.success("Attendance marked for today!")
         else:
             st.warning("You have already marked attendance for today.")
+    ledger = attendance.get_ledger()
+    st.write(f"Current streak: {ledger.current_streak(username)} day(s) · "
+             f"Visits in the last 30 days: {ledger.visits_in_last(username, 30)}")
     st.write(f"Hello, {username}! Welcome to your personal fitness tracker.")
     st.write("---")
-        # Categorized food list
-    food_categories = {
-            "Proteins & Meats": {
-                "Chicken Breast": {"Calories": 165, "Protein": 31, "Fat": 3.6, "Vitamins": ["B6", "Niacin"]},
-                "Turkey Breast": {"Calories": 135, "Protein": 29, "Fat": 1, "Vitamins": ["B6", "Niacin"]},
-                "Salmon": {"Calories": 208, "Protein": 22, "Fat": 13, "Vitamins": ["Omega-3", "B12"]},
-                "Tuna": {"Calories": 132, "Protein": 29, "Fat": 0.6, "Vitamins": ["Omega-3", "B12"]},
-                "Eggs": {"Calories": 68, "Protein": 6, "Fat": 5, "Vitamins": ["B12", "Choline"]}
-            },
-            
-            "Vegetables": {
-                "Spinach": {"Calories": 23, "Protein": 2.9, "Fat": 0.4, "Vitamins": ["Iron", "Vitamin K"]},
-                "Kale": {"Calories": 49, "Protein": 4.3, "Fat": 0.9, "Vitamins": ["Vitamin A", "Vitamin C"]},
-                "Broccoli": {"Calories": 55, "Protein": 4.3, "Fat": 0.6, "Vitamins": ["Vitamin C", "Fiber"]},
-                "Carrots": {"Calories": 41, "Protein": 0.9, "Fat": 0.2, "Vitamins": ["Vitamin A"]},
-                "Sweet Potatoes": {"Calories": 86, "Protein": 2, "Fat": 0.1, "Vitamins": ["Vitamin A"]}
-            },
-
-            "Fruits": {
-                "Apples": {"Calories": 52, "Protein": 0.3, "Fat": 0.2, "Vitamins": ["Vitamin C", "Fiber"]},
-                "Bananas": {"Calories": 89, "Protein": 1.1, "Fat": 0.3, "Vitamins": ["Potassium"]},
-                "Oranges": {"Calories": 47, "Protein": 0.9, "Fat": 0.1, "Vitamins": ["Vitamin C"]},
-                "Blueberries": {"Calories": 57, "Protein": 0.7, "Fat": 0.3, "Vitamins": ["Antioxidants"]},
-                "Strawberries": {"Calories": 32, "Protein": 0.7, "Fat": 0.3, "Vitamins": ["Vitamin C"]}
-            },
-
-            "Nuts & Seeds": {
-                "Almonds": {"Calories": 579, "Protein": 21, "Fat": 50, "Vitamins": ["Vitamin E"]},
-                "Walnuts": {"Calories": 654, "Protein": 15, "Fat": 65, "Vitamins": ["Omega-3"]},
-                "Cashews": {"Calories": 553, "Protein": 18, "Fat": 44, "Vitamins": ["Magnesium"]},
-                "Chia Seeds": {"Calories": 486, "Protein": 16, "Fat": 31, "Vitamins": ["Omega-3"]},
-                "Pumpkin Seeds": {"Calories": 559, "Protein": 30, "Fat": 49, "Vitamins": ["Iron"]}
-            },
-
-            "Seafood": {
-                "Mackerel": {"Calories": 205, "Protein": 19, "Fat": 13, "Vitamins": ["Omega-3"]},
-                "Sardines": {"Calories": 208, "Protein": 25, "Fat": 11, "Vitamins": ["Calcium"]},
-                "Trout": {"Calories": 168, "Protein": 22, "Fat": 10, "Vitamins": ["Omega-3"]},
-                "Oysters": {"Calories": 81, "Protein": 9, "Fat": 2, "Vitamins": ["Zinc"]},
-                "Crab": {"Calories": 97, "Protein": 20, "Fat": 1.5, "Vitamins": ["B12"]}
-            },
-
-            "Whole Grains & Legumes": {
-                "Brown Rice": {"Calories": 111, "Protein": 2.6, "Fat": 0.9, "Vitamins": ["Fiber"]},
-                "Quinoa": {"Calories": 120, "Protein": 4.1, "Fat": 1.9, "Vitamins": ["Magnesium"]},
-                "Oats": {"Calories": 389, "Protein": 17, "Fat": 7, "Vitamins": ["Fiber"]},
-                "Lentils": {"Calories": 116, "Protein": 9, "Fat": 0.4, "Vitamins": ["Iron"]},
-                "Chickpeas": {"Calories": 164, "Protein": 9, "Fat": 2.6, "Vitamins": ["Folate"]}
-            },
-
-            "Dairy & Alternatives": {
-                "Greek Yogurt": {"Calories": 97, "Protein": 10, "Fat": 5, "Vitamins": ["Probiotics"]},
-                "Cottage Cheese": {"Calories": 98, "Protein": 11, "Fat": 4, "Vitamins": ["Calcium"]},
-                "Cheddar Cheese": {"Calories": 403, "Protein": 25, "Fat": 33, "Vitamins": ["Calcium"]},
-                "Milk": {"Calories": 42, "Protein": 3.4, "Fat": 1, "Vitamins": ["Calcium"]},
-                "Tofu": {"Calories": 144, "Protein": 15, "Fat": 9, "Vitamins": ["Iron"]}
-            },
-
-            "Superfoods & Miscellaneous": {
-                "Dark Chocolate": {"Calories": 546, "Protein": 7.9, "Fat": 31, "Vitamins": ["Iron"]},
-                "Coconut": {"Calories": 354, "Protein": 3.3, "Fat": 33, "Vitamins": ["Manganese"]},
-                "Kimchi": {"Calories": 15, "Protein": 1, "Fat": 0.5, "Vitamins": ["Probiotics"]},
-                "Miso": {"Calories": 199, "Protein": 12, "Fat": 6, "Vitamins": ["Probiotics"]},
-                "Seaweed": {"Calories": 45, "Protein": 5, "Fat": 1, "Vitamins": ["Iodine"]}
-            }
-        }
+
+    # Each panel below is a Streamlit fragment: changing one of its widgets reruns only
+    # that panel instead of the whole page (and the prediction pipeline with it).
+    @st.fragment
+    def food_panel():
+        # Categorized food list (catalog/foods.json)
+        food_categories = catalog.get_catalog().foods
 
         # Sidebar UI
-    st.sidebar.header("Food Nutritional Information")
+        st.sidebar.header("Food Nutritional Information")
 
         # Select category
-    category = st.sidebar.selectbox("Select Category", list(food_categories.keys()))
+        category = st.sidebar.selectbox("Select Category", list(food_categories.keys()))
 
         # Select food item within category
-    if category:
-        food_option = st.sidebar.selectbox("Select Food", list(food_categories[category].keys()))
+        if category:
+            food_option = st.sidebar.selectbox("Select Food", list(food_categories[category].keys()))
 
             # Select quantity
-        quantity_option = st.sidebar.selectbox("Select Quantity", ["250g", "500g", "750g", "1kg", "1.5kg", "2kg"])
-        quantity_multiplier = {"250g": 0.25, "500g": 0.5, "750g": 0.75, "1kg": 1, "1.5kg": 1.5, "2kg": 2}
+            quantity_option = st.sidebar.selectbox("Select Quantity", ["250g", "500g", "750g", "1kg", "1.5kg", "2kg"])
+            quantity_grams = {"250g": 250, "500g": 500, "750g": 750, "1kg": 1000, "1.5kg": 1500, "2kg": 2000}
 
             # Display nutritional info
-        if food_option:
-            st.write(f"### {food_option} Nutritional Information ({quantity_option})")
-            for nutrient, value in food_categories[category][food_option].items():
-                if isinstance(value, list):
-                    st.write(f"**{nutrient}**: {', '.join(value)}")
-                else:
-                    st.write(f"**{nutrient}**: {value * quantity_multiplier[quantity_option]}")
-        st.write("---")
+            if food_option:
+                st.write(f"### {food_option} Nutritional Information ({quantity_option})")
+                for nutrient, value in food_categories[category][food_option].items():
+                    if isinstance(value, list):
+                        st.write(f"**{nutrient}**: {', '.join(value)}")
+                    else:
+                        st.write(f"**{nutrient}**: {round(value * quantity_grams[quantity_option] / nutrition.PER_GRAMS, 2)}")
+            st.write("---")
 
+    food_panel()
 
-        fitness_juices = {
-    "Muscle Recovery & Growth": {
-        "Banana Almond Protein Shake": (
-            "Rich in protein, almond milk and banana combine to promote muscle recovery and growth."
-        ),
-        "Chocolate Peanut Butter Smoothie": (
-            "A tasty, protein-packed drink with antioxidants from cocoa and healthy fats from peanut butter."
-        ),
-        "Spinach Avocado Protein Juice": (
-            "Loaded with amino acids and vitamins, this juice supports muscle regeneration and overall health."
-        ),
-        "Greek Yogurt Blueberry Smoothie": (
-            "Packed with protein and antioxidants, this smoothie aids in muscle repair and reduces inflammation."
-        ),
-        "Mango Coconut Protein Shake": (
-            "A tropical, nutrient-dense shake that blends mango and coconut for post-workout replenishment."
-        ),
-        "Pineapple Ginger Recovery Juice": (
-            "An anti-inflammatory juice that helps soothe muscles and speed up recovery."
-        ),
-        "Beetroot Carrot Juice": (
-            "Rich in nitrates, this juice boosts muscle oxygenation and supports recovery."
-        ),
-        "Watermelon Basil Juice": (
-            "Provides hydration and amino acids for muscle repair and post-exercise recovery."
-        ),
-        "Papaya Honey Smoothie": (
-            "A blend that supports digestion and provides nutrients for muscle growth."
-        ),
-        "Turmeric Golden Milk Shake": (
-            "Infused with turmeric's anti-inflammatory properties to soothe post-workout soreness."
-        )
-    },
-    "Fat Burning & Metabolism Boosting": {
-        "Green Apple Celery Juice": (
-            "A refreshing blend that’s low in calories and high in antioxidants to support fat burning."
-        ),
-        "Grapefruit Fat Burner Juice": (
-            "Packed with vitamin C and enzymes that boost metabolism and support weight loss."
-        ),
-        "Lemon Ginger Detox Juice": (
-            "A tangy and spicy combo that revs up your metabolism while aiding digestion."
-        ),
-        "Apple Cider Vinegar Drink": (
-            "Famous for its fat-burning properties and ability to regulate blood sugar levels."
-        ),
-        "Cucumber Mint Fat Cutter": (
-            "Cucumber keeps you hydrated while mint stimulates digestion and fat metabolism."
-        ),
-        "Carrot Beet Metabolism Booster": (
-            "A nutrient-rich juice that improves metabolic rate and supports fat loss."
-        ),
-        "Orange Cinnamon Juice": (
-            "A metabolism-enhancing juice with antioxidants and a burst of flavor."
-        ),
-        "Pineapple Chia Fat-Burner": (
-            "Chia seeds add fiber and omega-3s while pineapple promotes fat loss."
-        ),
-        "Matcha Green Tea Smoothie": (
-            "A metabolism-boosting drink rich in antioxidants and energy-boosting matcha."
-        ),
-        "Spinach Lemon Green Juice": (
-            "Low-calorie juice loaded with iron and vitamin C to enhance fat burning."
-        )
-    },
-    "Energy & Endurance Boosting": {
-        "Banana Date Energy Smoothie": (
-            "Rich in natural sugars and potassium, this smoothie is perfect for a pre-workout energy boost."
-        ),
-        "Sweet Potato Cinnamon Smoothie": (
-            "A nutrient-packed blend providing long-lasting energy and vitamins for endurance."
-        ),
-        "Pomegranate Power Juice": (
-            "Full of antioxidants, this juice aids in improving stamina and cardiovascular health."
-        ),
-        "Coconut Water Electrolyte Drink": (
-            "An all-natural drink filled with electrolytes to keep you hydrated and energized."
-        ),
-        "Grape Honey Energy Juice": (
-            "A sweet treat combining natural sugars from grapes and honey to keep your energy levels high."
-        ),
-        "Acai Berry Power Blend": (
-            "Rich in antioxidants and natural sugars, it provides a quick energy boost."
-        ),
-        "Watermelon Coconut Juice": (
-            "Packed with electrolytes and hydration to support endurance workouts."
-        ),
-        "Cherry Lemonade Energy Drink": (
-            "Loaded with vitamin C and natural sugars to sustain energy levels."
-        ),
-        "Pineapple Papaya Juice": (
-            "A tropical juice with a mix of nutrients to fuel your workouts."
-        ),
-        "Guava Strawberry Energizer": (
-            "High in vitamins and minerals, this juice boosts energy and keeps you refreshed."
-        )
-    },
-    "Hydration & Detoxification": {
-        "Cucumber Aloe Hydration Juice": (
-            "A cooling juice that hydrates deeply while supporting detoxification."
-        ),
-        "Lemon Cucumber Mint Detox Water": (
-            "A classic blend that flushes toxins and keeps you hydrated."
-        ),
-        "Watermelon Coconut Hydrator": (
-            "Combines watermelon and coconut water for a powerful hydrating drink."
-        ),
-        "Chia Seed Lime Drink": (
-            "Packed with fiber and hydration, this drink aids in flushing out toxins."
-        ),
-        "Kiwi Cucumber Cooler": (
-            "A refreshing and vitamin-rich juice that hydrates and detoxifies."
-        ),
-        "Aloe Vera Honey Detox Drink": (
-            "A sweet and soothing drink that promotes digestion and detoxification."
-        ),
-        "Orange Basil Infused Water": (
-            "A flavorful detox drink combining citrus and herbs for a refreshing touch."
-        ),
-        "Celery Lemon Hydration Juice": (
-            "A hydrating juice rich in electrolytes and vitamins."
-        ),
-        "Blueberry Coconut Detox Drink": (
-            "A delicious antioxidant-rich drink to cleanse your system."
-        ),
-        "Green Tea Lemon Detox Smoothie": (
-            "A metabolism-boosting smoothie with detoxifying green tea."
-        )
-    },
-    "Immunity & Overall Health": {
-        "Carrot Ginger Turmeric Juice": (
-            "Packed with immunity-boosting ingredients to fight inflammation."
-        ),
-        "Spinach Kale Super Juice": (
-            "A superfood-rich juice that boosts immunity and overall wellness."
-        ),
-        "Citrus Honey Ginger Elixir": (
-            "A vitamin C-rich elixir to keep your immune system strong."
-        ),
-        "Pineapple Orange Vitamin C Boost": (
-            "A tangy drink loaded with vitamin C to support immunity."
-        ),
-        "Mixed Berry Antioxidant Juice": (
-            "A blend of berries high in antioxidants to promote health."
-        ),
-        "Mango Carrot Vitamin A Juice": (
-            "Rich in vitamin A and other nutrients to enhance immune function."
-        ),
-        "Apple Cinnamon Immunity Shot": (
-            "A quick shot of nutrients and anti-inflammatory properties."
-        ),
-        "Strawberry Kiwi Vitamin C Drink": (
-            "A sweet and tangy drink filled with immune-boosting vitamins."
-        ),
-        "Broccoli Spinach Health Juice": (
-            "A nutrient-packed juice for overall health and immunity."
-        ),
-        "Ginger Lemon Wellness Shot": (
-            "A quick and potent drink to fight inflammation and boost immunity."
-        )
-    }
-        }
+    @st.fragment
+    def juice_panel():
+        fitness_juices = catalog.get_catalog().juices
 
         # Streamlit Application
         st.sidebar.header("Fitness Juices")
@@ -440,77 +239,14 @@ else:
         st.markdown(fitness_juices[category][juice_name])
         st.write("---")
 
-        gym_equipment = {
-    "Strength Training Equipment (Weights & Machines)": {
-        "Dumbbells": "2 - 50 kg (based on strength level)",
-        "Barbells": "10 - 20 kg (without plates)",
-        "Weight Plates": "2.5 - 25 kg per plate",
-        "Kettlebells": "4 - 40 kg",
-        "Resistance Bands": "Light, Medium, Heavy, Extra Heavy",
-        "Smith Machine": "20 - 60 kg bar & additional plates",
-        "Cable Machine": "5 - 90 kg weight stack",
-        "Leg Press Machine": "40 - 300 kg (adjustable)",
-        "Chest Press Machine": "10 - 80 kg weight stack",
-        "Shoulder Press Machine": "10 - 70 kg"
-    },
-    "Bodyweight & Functional Training Equipment": {
-        "Pull-up Bar": "Bodyweight",
-        "Parallel Dip Bars": "Bodyweight",
-        "Power Rack": "Adjustable (holds up to 200+ kg)",
-        "TRX Suspension Trainer": "NA",
-        "Gymnastic Rings": "NA",
-        "Plyometric Box": "30cm, 45cm, 60cm heights",
-        "Medicine Ball": "2 - 15 kg",
-        "Battle Ropes": "9 - 15 meters long",
-        "Ab Roller": "NA",
-        "Jump Rope": "Adjustable Length"
-    },
-    "Cardio Equipment": {
-        "Treadmill": "User Weight: Up to 180 kg",
-        "Stationary Bike": "Adjustable resistance",
-        "Rowing Machine": "Adjustable resistance",
-        "Stair Climber": "NA",
-        "Elliptical Trainer": "NA",
-        "Assault Bike": "NA",
-        "Ski Erg": "NA",
-        "Air Rower": "NA",
-        "Battle Ropes": "9 - 15 meters",
-        "Speed Ladder": "NA"
-    },
-    "Leg & Core Strength Equipment": {
-        "Squat Rack": "Supports up to 300+ kg",
-        "Calf Raise Machine": "10 - 80 kg",
-        "Glute Ham Developer": "NA",
-        "Leg Curl Machine": "10 - 100 kg",
-        "Hack Squat Machine": "40 - 300 kg",
-        "Hip Thrust Machine": "20 - 200 kg",
-        "Seated Ab Crunch Machine": "10 - 80 kg",
-        "Roman Chair": "NA",
-        "Stability Ball": "55cm - 75cm",
-        "Weighted Vest": "5 - 20 kg"
-    },
-    "Recovery & Mobility Equipment": {
-        "Foam Roller": "NA",
-        "Massage Gun": "NA",
-        "Resistance Bands": "Light - Heavy",
-        "Yoga Mat": "NA",
-        "Balance Board": "NA",
-        "Hand Grippers": "10 - 100 kg",
-        "Wrist/Ankle Weights": "0.5 - 5 kg",
-        "Stretching Strap": "NA",
-        "Infrared Sauna": "NA",
-        "Ice Bath Tub": "NA"
-    }
-}
+    juice_panel()
+
+    @st.fragment
+    def equipment_panel():
+        gym_equipment = catalog.get_catalog().equipment
 
-# Age-Based Equipment Usage Guide
-        age_guide = {
-    "Kids (10-14)": "Bodyweight exercises only",
-    "Teens (15-18)": "Light dumbbells (2-10kg), resistance bands",
-    "Beginners (19-30)": "Dumbbells (5-15kg), barbell (20-40kg)",
-    "Intermediate (30-50)": "Dumbbells (15-30kg), barbell (40-80kg)",
-    "Advanced (50+)": "Adjust weights based on endurance & recovery"
-        }
+        # Age-Based Equipment Usage Guide
+        age_guide = catalog.get_catalog().age_guide
 
         # Streamlit Application
         st.sidebar.header("Gym Equipment & Usage Guide")
@@ -529,32 +265,14 @@ else:
         st.markdown(f"**{age_group}**: {age_guide[age_group]}")
         st.write("---")
 
+    equipment_panel()
+
+    @st.fragment
+    def workout_panel():
         # Workout Types
         st.header("Workout Types")
-        workout_type = st.selectbox("Select Workout Type", ["Cardio", "Strength Training", "Leg Workouts", "Full-Body Workouts", "Yoga Workouts", "Pilates Workouts", "Core & Abs Workouts", "HIIT", "Stretching & Mobility Workouts", "CrossFit Workouts", "Calisthenics", "Powerlifting", "Functional Fitness", "Bodyweight Workouts", "Martial Arts Workouts", "Swimming Workouts", "Dance Workouts", "Endurance Training", "Plyometrics", "Outdoor & Adventure Workouts"])
-        
-        workout_exercises = {
-            "Cardio": ["Running", "Jump Rope", "Cycling", "Rowing", "Stair Climbing"],
-            "Strength Training": ["Bench Press", "Deadlifts", "Bicep Curls", "Shoulder Press", "Squats"],
-            "Leg Workouts": ["Lunges", "Leg Press", "Calf Raises", "Step-Ups", "Bulgarian Split Squats"],
-            "Full-Body Workouts": ["Burpees", "Kettlebell Swings", "Mountain Climbers", "Clean and Press", "Medicine Ball Slams"],
-            "Yoga Workouts": ["Downward Dog", "Warrior Pose", "Tree Pose", "Cobra Pose", "Child’s Pose"],
-            "Pilates Workouts": ["Leg Circles", "Hundred", "Rolling Like a Ball", "Single-Leg Stretch", "Teaser"],
-            "Core & Abs Workouts": ["Planks", "Russian Twists", "Bicycle Crunches", "Hanging Leg Raises", "Ab Rollouts"],
-            "HIIT": ["Sprint Intervals", "Jump Squats", "Battle Ropes", "Box Jumps", "Kettlebell Snatches"],
-            "Stretching & Mobility Workouts": ["Static Stretching", "Dynamic Stretching", "Foam Rolling", "Hip Openers", "Shoulder Mobility Drills"],
-            "CrossFit Workouts": ["Wall Balls", "Power Cleans", "Box Step-Ups", "Rope Climbs", "Thrusters"],
-            "Calisthenics": ["Pull-Ups", "Muscle-Ups", "Dips", "L-Sits", "Pistol Squats"],
-            "Powerlifting": ["Back Squat", "Deadlift", "Bench Press", "Overhead Press", "Snatch"],
-            "Functional Fitness": ["Farmer’s Walk", "Sled Push", "Medicine Ball Throws", "Sandbag Carries", "Battle Rope Slams"],
-            "Bodyweight Workouts": ["Push-Ups", "Sit-Ups", "Triceps Dips", "Wall Sits", "Jump Lunges"],
-            "Martial Arts Workouts": ["Kickboxing", "Brazilian Jiu-Jitsu", "Muay Thai", "Boxing", "Judo"],
-            "Swimming Workouts": ["Freestyle", "Butterfly", "Backstroke", "Breaststroke", "Treading Water"],
-            "Dance Workouts": ["Zumba", "Hip-Hop Cardio", "Salsa Workouts", "Ballet Conditioning", "Bollywood Dance Fitness"],
-            "Endurance Training": ["Marathon Running", "Long-Distance Cycling", "Rowing Machine", "Swimming Laps", "Trail Running"],
-            "Plyometrics": ["Box Jumps", "Depth Jumps", "Hurdle Hops", "Plyo Push-Ups", "Bounding Drills"],
-            "Outdoor & Adventure Workouts": ["Hiking", "Rock Climbing", "Kayaking", "Skiing", "Trail Running"]
-        }
+        workout_exercises = catalog.get_catalog().workouts
+        workout_type = st.selectbox("Select Workout Type", list(workout_exercises.keys()))
         
         if workout_type in workout_exercises:
             st.write(f"{workout_type} Exercises**")
@@ -562,99 +280,11 @@ else:
                 st.write(exercise)
         st.write("---")
 
-        exercise_styles = {
-    "Martial Arts-Based Exercises (Strength + Agility)": {
-        "Karate": "Focuses on strikes, blocks, and katas to enhance strength, coordination, and reflexes.",
-        "Taekwondo": "Emphasizes high kicks and fast movements to improve flexibility and agility.",
-        "Muay Thai": "A full-body workout involving punches, kicks, elbows, and knees to build endurance.",
-        "Judo": "A grappling sport that strengthens core muscles and improves balance.",
-        "Boxing": "Boosts stamina, reflexes, and upper-body strength through intense training.",
-        "Kickboxing": "Combines the agility of boxing and the strength of karate for a cardio-intensive workout.",
-        "Brazilian Jiu-Jitsu (BJJ)": "Focuses on ground techniques that enhance flexibility and endurance.",
-        "Krav Maga": "Real-world self-defense that integrates intense conditioning exercises.",
-        "Wrestling": "Builds muscle control and body awareness through grappling techniques.",
-        "Capoeira": "A Brazilian martial art blending dance and acrobatics for agility and fluid motion."
-    },
-    "Mindful & Flow-Based Exercises (Balance + Mobility)": {
-        "Hatha Yoga": "Involves slow poses and deep breathing to promote relaxation and mindfulness.",
-        "Vinyasa Yoga": "A flow-based practice that improves endurance, flexibility, and balance.",
-        "Power Yoga": "Combines strength-building poses with dynamic movements for a full-body workout.",
-        "Restorative Yoga": "Uses props for deep relaxation and physical recovery.",
-        "Chair Yoga": "Adaptive poses designed for individuals with limited mobility.",
-        "Pilates": "Focuses on core strength, flexibility, and posture through controlled movements.",
-        "Tai Chi": "A gentle martial art that reduces stress and improves balance.",
-        "Qigong": "Integrates breath control and slow movements to improve energy flow.",
-        "Yin Yoga": "Holds passive stretches for extended periods to release deep tissue tension.",
-        "Aerial Yoga": "Uses fabric hammocks to support strength-building and flexibility exercises."
-    },
-    "Traditional Eastern Flow Arts (Flexibility + Energy Control)": {
-        "Ashtanga Yoga": "Follows a structured sequence of poses to develop discipline and strength.",
-        "Bikram Yoga (Hot Yoga)": "Conducted in a heated room to promote detoxification and flexibility.",
-        "Iyengar Yoga": "Focuses on alignment and posture with the use of props.",
-        "Pranayama": "Breathing exercises aimed at increasing lung capacity and mental clarity.",
-        "Kalaripayattu": "An ancient Indian martial art that combines weapon-based and body movements.",
-        "Shaolin Kung Fu": "Incorporates intense training to improve body control and focus.",
-        "Japanese Kenjutsu": "Sword techniques that build precision, balance, and agility.",
-        "Indian Mallakhamb": "Traditional pole and rope exercises to enhance core strength.",
-        "Baguazhang": "A martial art with flowing movements to improve energy flow and coordination.",
-        "Zhan Zhuang (Standing Meditation)": "Builds endurance, stability, and focus by holding postures."
-    },
-    "Strength & Core-Based Disciplines (Control + Stamina)": {
-        "Calisthenics": "A bodyweight training style focused on strength and mobility.",
-        "Street Workout": "Includes pull-ups, dips, and dynamic exercises for overall body conditioning.",
-        "CrossFit": "High-intensity workouts that enhance strength and functional fitness.",
-        "Animal Flow": "Primal movement exercises to improve agility and body coordination.",
-        "Parkour": "Involves overcoming obstacles to boost agility and functional strength.",
-        "Hand Balancing": "Challenges core and wrist strength through balancing exercises.",
-        "Plank Variations": "Strengthens the core and improves stability.",
-        "Battle Ropes": "High-intensity ropes improve endurance and upper body strength.",
-        "Kettlebell Training": "Focuses on power, strength, and coordination with kettlebell exercises.",
-        "Farmer’s Walk": "Enhances grip strength and overall core stability by carrying weights."
-    },
-    "Combat & Strength-Based Functional Training": {
-        "MMA (Mixed Martial Arts)": "Combines boxing, wrestling, and ground fighting for a full-body workout.",
-        "Sandbag Training": "Develops raw power and grip strength using sand-filled bags.",
-        "Tire Flipping": "Improves explosive strength through repetitive tire movements.",
-        "Sledgehammer Workouts": "Targets endurance and coordination with sledgehammer swings.",
-        "Bulgarian Bag Training": "Enhances rotational strength using sand-filled bags.",
-        "Resistance Band Combat Drills": "Adds resistance to combat-specific movements.",
-        "Speed Drills with Parachutes": "Increases sprint speed and explosive power.",
-        "Agility Ladder Drills": "Improves quick footwork and coordination.",
-        "Sled Push/Pull": "Boosts power and lower body endurance with resistance sleds.",
-        "Olympic Lifting": "Focuses on explosive strength through powerlifting techniques."
-    },
-    "Explosive & Agility-Based Workouts": {
-        "Sprint Drills": "Improves speed and endurance through high-intensity intervals.",
-        "Box Jumps": "Develops explosive lower body power and coordination.",
-        "Hurdle Drills": "Increases agility and reflexes with fast footwork exercises.",
-        "Jump Rope": "Boosts cardiovascular endurance with rhythmic skipping.",
-        "High-Knees": "Engages the core and improves leg endurance.",
-        "Plyometric Push-Ups": "Enhances upper body explosiveness through dynamic push-ups.",
-        "Depth Jumps": "Strengthens fast-twitch muscles for explosive movements.",
-        "Single-Leg Hops": "Improves balance and power with hopping exercises.",
-        "Cone Drills": "Focuses on quickness and multi-directional agility.",
-        "Hill Sprints": "Builds lower body strength through resistance running."
-    },
-    "Holistic & Hybrid Practices": {
-        "Dance-Based Workouts": "A fun way to stay fit with Zumba, Hip-Hop, and other dance styles.",
-        "Barre Workouts": "Combines ballet, Pilates, and yoga for flexibility and strength.",
-        "Functional Mobility Drills": "Improves joint health and movement efficiency.",
-        "Foam Rolling & Myofascial Release": "Relieves muscle tension and improves recovery.",
-        "Breathwork Exercises": "Strengthens lung capacity and mental focus.",
-        "Stretch Therapy": "Enhances flexibility and helps prevent injuries.",
-        "TRX Suspension Training": "Uses body weight for functional strength improvement.",
-        "Aqua Workouts": "Low-impact exercises conducted in water for resistance training.",
-        "Barefoot Training": "Strengthens foot mechanics and balance.",
-        "Isometric Holds": "Builds endurance and stability by holding positions."
-    },
-    "Extreme Flexibility & Flow Training": {
-        "Splits Training": "Improves flexibility for advanced movements.",
-        "Bridge Training": "Strengthens the spine and core for backbends.",
-        "Contortion Training": "Develops extreme flexibility and body control.",
-        "Scorpion Pose": "An advanced pose to enhance balance and flexibility.",
-        "Flagpole Hold": "Requires core and upper body strength for balance."
-    }
-    }
+    workout_panel()
+
+    @st.fragment
+    def exercise_style_panel():
+        exercise_styles = catalog.get_catalog().exercise_styles
 
         # Streamlit Application
         st.sidebar.header("Exercise Styles")
@@ -666,6 +296,28 @@ else:
         st.markdown(f"**{exercise_name}**: {exercise_styles[category][exercise_name]}")
         st.write("---")
 
+    exercise_style_panel()
+
+    # Type-ahead search across every catalog above (foods, juices, equipment, workouts, styles)
+    @st.fragment
+    def catalog_search_panel():
+        st.header("Search the Catalogs")
+        query = st.text_input("Search foods, juices, equipment, workouts and exercise styles")
+        if query:
+            results = catalog.get_catalog().search(query)
+            if not results:
+                st.write("No matches.")
+            for result in results:
+                where = " › ".join(part for part in (result["catalog"], result["category"]) if part)
+                detail = f": {result['detail']}" if result["detail"] else ""
+                st.markdown(f"**{result['name']}** ({where}){detail}")
+        st.write("---")
+
+    catalog_search_panel()
+
+    # Reruns only when the User Input Parameters (or the Similar Results mode) change
+    @st.fragment
+    def prediction_section():
         # Existing Code: User Input Parameters
         st.header("INFORMATIONS:")
         st.sidebar.header("User Input Parameters: ")
@@ -702,83 +354,146 @@ else:
                 "Gender_male": gender
             }
 
-            features = pd.DataFrame(data_model, index=[0])
-            return features
+            return data_model
 
-        df = user_input_features()
+        inputs = user_input_features()
+        if inputs is None:
+            return
+        df = pd.DataFrame(inputs, index=[0])
+
+        # Progress bar driven by the real pipeline stages; their timings go to the metrics file
+        stage_bar = st.progress(0.0, text="Starting")
+        pipeline = instrumentation.PipelineRun(
+            ["data_load", "model_train_or_load", "predict", "similar_results", "percentiles"],
+            on_progress=lambda fraction, name: stage_bar.progress(fraction, text=f"Stage: {name}")
+        )
 
         st.header("Your Parameters: ")
-        latest_iteration = st.empty()
-        bar = st.progress(0)
-        for i in range(100):
-            bar.progress(i + 1)
-            time.sleep(0.01)
         st.write(df)
 
-        # Load and preprocess data
-        calories = pd.read_csv("calories.csv")
-        exercise = pd.read_csv("exercise.csv")
-
-        exercise_df = exercise.merge(calories, on="User_ID")
-        exercise_df.drop(columns="User_ID", inplace=True)
-
-        exercise_train_data, exercise_test_data = train_test_split(exercise_df, test_size=0.2, random_state=1)
-
-        for data in [exercise_train_data, exercise_test_data]:
-            data["BMI"] = data["Weight"] / ((data["Height"] / 100) ** 2)
-            data["BMI"] = round(data["BMI"], 2)
-
-        exercise_train_data = exercise_train_data[["Gender", "Age", "BMI", "Duration", "Heart_Rate", "Body_Temp", "Calories"]]
-        exercise_test_data = exercise_test_data[["Gender", "Age", "BMI", "Duration", "Heart_Rate", "Body_Temp", "Calories"]]
-        exercise_train_data = pd.get_dummies(exercise_train_data, drop_first=True)
-        exercise_test_data = pd.get_dummies(exercise_test_data, drop_first=True)
-
-        X_train = exercise_train_data.drop("Calories", axis=1)
-        y_train = exercise_train_data["Calories"]
-
-        X_test = exercise_test_data.drop("Calories", axis=1)
-        y_test = exercise_test_data["Calories"]
-
-        random_reg = RandomForestRegressor(n_estimators=1000, max_features=3, max_depth=6)
-        random_reg.fit(X_train, y_train)
-
-        df = df.reindex(columns=X_train.columns, fill_value=0)
-
-        prediction = random_reg.predict(df)
+        # Shared, preprocessed training data (loaded once per server process)
+        with pipeline.stage("data_load"):
+            exercise_df = dataset.load_exercise_df()
+
+        # The model is built in the background; sessions keep serving the installed model
+        # until a newer one (for changed data or config) is swapped in
+        trainer = model_trainer.get_trainer()
+        with pipeline.stage("model_train_or_load"):
+            random_reg = trainer.current_model()
+            if random_reg is None:
+                # First start: nothing to serve yet, so wait for the trainer and show its progress
+                training_bar = st.progress(0.0, text="Preparing the calorie model")
+                while random_reg is None and trainer.is_busy():
+                    status = trainer.status()
+                    training_bar.progress(status["progress"], text=f"Calorie model: {status['state']}")
+                    time.sleep(0.25)
+                    random_reg = trainer.current_model()
+                training_bar.empty()
+                random_reg = trainer.current_model()
+        if random_reg is None:
+            st.error(f"The calorie model could not be built: {trainer.status()['error']}")
+            return
+
+        # Slider values go straight into a float row in the model's column order
+        encoder = feature_encoder.for_model(random_reg)
+        features = encoder.encode_row(inputs)
+
+        # Predictions are memoized per input combination and shared by all sessions
+        with pipeline.stage("predict"):
+            predictions = prediction_cache.get_cache(random_reg)
+            prediction = [predictions.predict(features)]
 
         st.write("---")
         st.header("Prediction: ")
-        latest_iteration = st.empty()
-        bar = st.progress(0)
-        for i in range(100):
-            bar.progress(i + 1)
-            time.sleep(0.01)
-
         st.write(f"{round(prediction[0], 2)} *kilocalories*")
+        # The meal builder compares today's intake with this; it is a separate fragment, so
+        # rerun the whole page when the prediction changes while meals are logged
+        previous_prediction = st.session_state.get("predicted_calories")
+        st.session_state.predicted_calories = prediction[0]
+        if st.session_state.get("meal_items") and previous_prediction is not None and previous_prediction != prediction[0]:
+            st.rerun()
+
+        model_status = trainer.status()
+        model_version = f"Model version {(model_status['version'] or '')[:8]}"
+        if model_status["state"] in ("loading", "training", "refreshing"):
+            model_version += f" · building {(model_status['target_version'] or '')[:8]} ({round(model_status['progress'] * 100)}%)"
+        elif model_status["state"] == "failed":
+            model_version += f" · last rebuild failed: {model_status['error']}"
+        st.caption(model_version)
+        cache_info = model_store.cache_stats()
+        st.caption(f"Model cache: {cache_info['hits']} hits, {cache_info['misses']} misses, "
+                   f"{cache_info['disk_loads']} disk loads ({round(cache_info['load_time'], 2)}s load time); "
+                   f"prediction cache hit rate {round(predictions.hit_rate() * 100, 1)}%")
+        st.caption(f"Dataset memory: {round(dataset.memory_report['before_bytes'] / 1e6, 2)} MB before downcast, "
+                   f"{round(dataset.memory_report['after_bytes'] / 1e6, 2)} MB after")
+        user_cache_info = users.stats()
+        st.caption(f"User cache: {user_cache_info['hits']} hits, {user_cache_info['misses']} misses, "
+                   f"{user_cache_info['invalidations']} invalidations ({round(user_cache_info['reload_time'], 3)}s reading the store)")
 
         st.write("---")
         st.header("Similar Results: ")
-        latest_iteration = st.empty()
-        bar = st.progress(0)
-        for i in range(100):
-            bar.progress(i + 1)
-            time.sleep(0.01)
-
-        calorie_range = [prediction[0] - 10, prediction[0] + 10]
-        similar_data = exercise_df[(exercise_df["Calories"] >= calorie_range[0]) & (exercise_df["Calories"] <= calorie_range[1])]
-        st.write(similar_data.sample(5))
+        similar_mode = st.radio("Similar by", ["Calories", "Profile"], horizontal=True)
+        with pipeline.stage("similar_results"):
+            similarity_index = similarity.get_index(exercise_df)
+            if similar_mode == "Calories":
+                similar_data = similarity_index.similar_calories(prediction[0], k=5)
+            else:
+                similar_data = similarity_index.similar_profile(dict(zip(encoder.columns, features)), k=5)
+        st.write(similar_data)
 
         st.write("---")
         st.header("General Information: ")
-        boolean_age = (exercise_df["Age"] < df["Age"].values[0]).tolist()
-        boolean_duration = (exercise_df["Duration"] < df["Duration"].values[0]).tolist()
-        boolean_body_temp = (exercise_df["Body_Temp"] < df["Body_Temp"].values[0]).tolist()
-        boolean_heart_rate = (exercise_df["Heart_Rate"] < df["Heart_Rate"].values[0]).tolist()
-
-        st.write("You are older than", round(sum(boolean_age) / len(boolean_age), 2) * 100, "% of other people.")
-        st.write("Your exercise duration is higher than", round(sum(boolean_duration) / len(boolean_duration), 2) * 100, "% of other people.")
-        st.write("You have a higher heart rate than", round(sum(boolean_heart_rate) / len(boolean_heart_rate), 2) * 100, "% of other people during exercise.")
-        st.write("You have a higher body temperature than", round(sum(boolean_body_temp) / len(boolean_body_temp), 2) * 100, "% of other people during exercise.")
+        with pipeline.stage("percentiles"):
+            percentile_index = percentiles.get_index(exercise_df)
+            shares = percentile_index.share_below_many({
+                column: inputs[column] for column in ["Age", "Duration", "Heart_Rate", "Body_Temp", "BMI"]
+            })
+        stage_bar.progress(1.0, text=f"Done in {round(pipeline.total() * 1000)} ms")
+
+        st.write("You are older than", round(shares["Age"], 2) * 100, "% of other people.")
+        st.write("Your exercise duration is higher than", round(shares["Duration"], 2) * 100, "% of other people.")
+        st.write("You have a higher heart rate than", round(shares["Heart_Rate"], 2) * 100, "% of other people during exercise.")
+        st.write("You have a higher body temperature than", round(shares["Body_Temp"], 2) * 100, "% of other people during exercise.")
+        st.write("Your BMI is higher than", round(shares["BMI"], 2) * 100, "% of other people.")
+
+    prediction_section()
+
+    # Meals logged for the day, totalled from the food table (values per 100 g)
+    @st.fragment
+    def meal_panel():
+        st.header("Meal Builder")
+        food_table = nutrition.get_food_table()
+        meal_items = st.session_state.setdefault("meal_items", [])
+
+        food = st.selectbox("Food", food_table.names, key="meal_food")
+        grams = st.number_input("Amount (g)", min_value=0, max_value=5000, value=100, step=25, key="meal_grams")
+        add_column, clear_column = st.columns(2)
+        if add_column.button("Add to today's meals") and grams > 0:
+            meal_items.append((food, grams))
+        if clear_column.button("Clear today's meals"):
+            meal_items.clear()
+
+        if meal_items:
+            meal_table = pd.DataFrame(food_table.item_totals(meal_items), columns=nutrition.NUTRIENTS).round(1)
+            meal_table.insert(0, "Food", [item for item, _ in meal_items])
+            meal_table.insert(1, "Grams", [amount for _, amount in meal_items])
+            st.write(meal_table)
+
+            totals = food_table.totals(meal_items)
+            st.write(f"**Today's total**: {round(totals['Calories'])} kcal, {round(totals['Protein'], 1)} g protein, "
+                     f"{round(totals['Fat'], 1)} g fat")
+            st.write(f"**Vitamins & minerals**: {', '.join(totals['Vitamins']) or 'none'}")
+
+            burned = st.session_state.get("predicted_calories")
+            if burned is not None:
+                balance = nutrition.energy_balance(totals["Calories"], burned)
+                st.write(f"Intake {round(balance['intake'])} kcal vs {round(balance['burned'])} kcal burned in the "
+                         f"predicted workout: net {round(balance['net']):+d} kcal")
+        else:
+            st.write("Add foods to see today's totals.")
+        st.write("---")
+
+    meal_panel()
 
     if st.sidebar.button("Logout", key="logout_button", use_container_width=True): st.session_state.login = False; st.session_state.current_user = None; st.rerun()
     
\ No newline at end of file
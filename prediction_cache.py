@@ -0,0 +1,146 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import model_store
+import scoring
+
+# Number of distinct inputs remembered per model
+CAPACITY = 50_000
+
+# Offline dense table: (start, stop, step) per model column for the common slider region.
+# 41 * 13 * 31 * 31 * 3 * 2 = ~3.1M cells, ~12 MB as float32.
+DENSE_GRID = {
+    "Age": (20, 60, 1),
+    "BMI": (18, 30, 1),
+    "Duration": (10, 40, 1),
+    "Heart_Rate": (80, 110, 1),
+    "Body_Temp": (38, 40, 1),
+    "Gender_male": (0, 1, 1),
+}
+
+
+# Table of precomputed predictions over a regular grid of the model's inputs
+class DenseTable:
+    def __init__(self, columns, grid, values):
+        self.columns = list(columns)
+        self.starts = np.array([grid[c][0] for c in self.columns], dtype=np.float64)
+        self.steps = np.array([grid[c][2] for c in self.columns], dtype=np.float64)
+        self.shape = values.shape
+        self.values = values
+
+    @classmethod
+    def build(cls, model, grid=DENSE_GRID, batch_size=200_000):
+        columns = list(model.feature_names_in_)
+        axes = [np.arange(grid[c][0], grid[c][1] + grid[c][2], grid[c][2], dtype=np.float64) for c in columns]
+        shape = tuple(len(axis) for axis in axes)
+        values = np.empty(int(np.prod(shape)), dtype=np.float32)
+        for start in range(0, len(values), batch_size):
+            flat = np.arange(start, min(start + batch_size, len(values)))
+            cells = np.unravel_index(flat, shape)
+            rows = np.column_stack([axes[i][cells[i]] for i in range(len(columns))])
+            values[start:start + len(flat)] = scoring.predict_encoded(model, rows)
+        return cls(columns, grid, values.reshape(shape))
+
+    def save(self, path):
+        grid = np.stack([self.starts, self.steps])
+        np.savez(path, values=self.values, grid=grid, columns=np.array(self.columns))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        columns = [str(c) for c in data["columns"]]
+        values = data["values"]
+        grid = {c: (data["grid"][0][i], None, data["grid"][1][i]) for i, c in enumerate(columns)}
+        return cls(columns, grid, values)
+
+    # Function to get the precomputed prediction, or None if the row is off the grid
+    def lookup(self, row):
+        position = (np.asarray(row, dtype=np.float64) - self.starts) / self.steps
+        index = np.rint(position)
+        if np.any(np.abs(position - index) > 1e-9) or np.any(index < 0) or np.any(index >= self.shape):
+            return None
+        return float(self.values[tuple(index.astype(np.int64))])
+
+
+# LRU cache of predictions keyed on the model's input columns, with an optional dense table
+# consulted first so the typical lookup is an array index instead of a forest traversal.
+class PredictionCache:
+    def __init__(self, model, capacity=CAPACITY, dense_table=None):
+        self.model = model
+        self.columns = list(model.feature_names_in_)
+        self.capacity = capacity
+        self.dense_table = dense_table
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "dense_hits": 0, "evictions": 0}
+
+    # Function to predict calories for one row already encoded in the model's column order
+    # (see feature_encoder.py), or for a one-row DataFrame (extra columns are ignored)
+    def predict(self, features):
+        if hasattr(features, "columns"):
+            features = features.reindex(columns=self.columns, fill_value=0).iloc[0]
+        key = tuple(float(value) for value in features)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key]
+
+        if self.dense_table is not None:
+            value = self.dense_table.lookup(key)
+            if value is not None:
+                with self._lock:
+                    self.stats["dense_hits"] += 1
+                return value
+
+        value = float(scoring.predict_encoded(self.model, np.array([key]))[0])
+        with self._lock:
+            self.stats["misses"] += 1
+            self._entries[key] = value
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return value
+
+    def hit_rate(self):
+        with self._lock:
+            total = self.stats["hits"] + self.stats["dense_hits"] + self.stats["misses"]
+            return (self.stats["hits"] + self.stats["dense_hits"]) / total if total else 0.0
+
+
+# Function to get the path of the dense table for a cached model
+def dense_table_path(model):
+    key = model_store.key_for(model)
+    return os.path.join(model_store.MODEL_DIR, f"{key}.dense.npz") if key else None
+
+
+_caches = {}
+_lock = threading.Lock()
+
+
+# Function to get the process-wide prediction cache for a model, with its dense table if built
+def get_cache(model):
+    with _lock:
+        cache = _caches.get(id(model))
+        if cache is None or cache.model is not model:
+            path = dense_table_path(model)
+            dense_table = DenseTable.load(path) if path and os.path.exists(path) else None
+            cache = PredictionCache(model, dense_table=dense_table)
+            _caches.clear()  # Only the current model's cache is worth keeping
+            _caches[id(model)] = cache
+    return cache
+
+
+if __name__ == "__main__":
+    # Offline mode: python prediction_cache.py builds the dense table for the cached model
+    model = model_store.get_model()
+    if model is None:
+        sys.exit("No trained model for the current data yet; open the fitness page once to train it.")
+    path = dense_table_path(model)
+    DenseTable.build(model).save(path)
+    print(f"Dense prediction table written to {path}")
@@ -0,0 +1,231 @@
+# Local HTTP/JSON service for calorie predictions, percentiles and similar sessions.
+# The model and the dataset indexes are loaded once at startup. Concurrent single-row
+# /predict requests are collected for a short window and scored with one model call.
+#
+#   python prediction_service.py [--port 8765] [--window-ms 2] [--max-batch 256]
+#
+#   POST /predict     {"Age": 30, "BMI": 22, "Duration": 15, "Heart_Rate": 90, "Body_Temp": 39, "Gender": "male"}
+#                     or {"rows": [{...}, ...]}            -> {"calories": 61.2} / {"calories": [...]}
+#                     (a bad row in "rows" gets null and an entry in "errors": {"<index>": "<message>"})
+#   POST /percentile  {"Age": 30, "BMI": [20, 25]}         -> share of sessions below each value
+#   POST /similar     {"calories": 200, "k": 5} or {"profile": {...}, "k": 5} -> matching sessions
+#   GET  /health, GET /stats
+
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import dataset
+import percentiles
+import scoring
+import similarity
+
+# How long the batcher waits for more requests after the first one arrives
+BATCH_WINDOW = 0.002
+MAX_BATCH = 256
+
+
+# Coalesces single-row predictions submitted from many threads into one predict call.
+# predict_fn takes a list of rows and returns one prediction per row. Rows should be
+# validated (encoded) before they are submitted: if predict_fn raises, every request
+# in that batch gets the error.
+# With window=0 every request is scored on its own (no batching).
+class MicroBatcher:
+    def __init__(self, predict_fn, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.predict_fn = predict_fn
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {"batches": 0, "requests": 0, "max_batch_size": 0}
+        if window > 0:
+            threading.Thread(target=self._run, name="predict-batcher", daemon=True).start()
+
+    def submit(self, row):
+        future = Future()
+        if self.window > 0:
+            self._queue.put((row, future))
+        else:
+            self._score([(row, future)])
+        return future
+
+    def predict(self, row, timeout=None):
+        return self.submit(row).result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        try:
+            values = self.predict_fn([row for row, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+        else:
+            for (_, future), value in zip(batch, values):
+                future.set_result(float(value))
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["requests"] += len(batch)
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+
+# Everything the handlers need, built once when the service starts
+class PredictionService:
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        # Forests come as the packed arrays shared with the app's workers (memory-mapped, not copied)
+        self.model = scoring.load_model()
+        self.exercise_df = dataset.load_exercise_df()
+        self.percentiles = percentiles.get_index(self.exercise_df)
+        self.similarity = similarity.get_index(self.exercise_df)
+        self.encoder = scoring.encoder_for(self.model)
+        # Rows reach the batcher already encoded, so a batch only stacks them
+        self.batcher = MicroBatcher(lambda rows: scoring.predict_encoded(self.model, np.vstack(rows)), window, max_batch)
+
+    # Function to encode one input row, rejecting missing columns and non-finite values
+    def encode_row(self, row, out=None):
+        if not isinstance(row, dict):
+            raise ValueError("Each row must be a JSON object")
+        out = self.encoder.encode_row(row, out)
+        if not np.isfinite(out).all():
+            raise ValueError("Inputs must be finite numbers")
+        return out
+
+    def predict(self, body):
+        if "rows" in body:
+            if not isinstance(body["rows"], list):
+                raise ValueError("'rows' must be a list")
+            return self.predict_rows(body["rows"])
+        # Encoding in the request's own thread rejects a malformed row before it can join a batch
+        return {"calories": self.batcher.predict(self.encode_row(body))}
+
+    # Function to score a list of rows, reporting the rows that can't be encoded one by one
+    def predict_rows(self, rows):
+        encoded = np.empty((len(rows), self.encoder.width))
+        errors = {}
+        for i, row in enumerate(rows):
+            try:
+                self.encode_row(row, encoded[i])
+            except (ValueError, KeyError, TypeError) as error:
+                errors[str(i)] = str(error)
+        valid = [i for i in range(len(rows)) if str(i) not in errors]
+        calories = [None] * len(rows)
+        if valid:
+            for i, value in zip(valid, scoring.predict_encoded(self.model, encoded[valid])):
+                calories[i] = float(value)
+        result = {"calories": calories}
+        if errors:
+            result["errors"] = errors
+        return result
+
+    def percentile(self, body):
+        shares = self.percentiles.share_below_many(body)
+        return {column: share if isinstance(share, float) else share.tolist() for column, share in shares.items()}
+
+    def similar(self, body):
+        k = int(body.get("k", 5))
+        if k < 1:
+            raise ValueError("'k' must be at least 1")
+        if "calories" in body:
+            calories = float(body["calories"])
+            if not math.isfinite(calories):
+                raise ValueError("'calories' must be a finite number")
+            sessions = self.similarity.similar_calories(calories, k)
+        elif "profile" in body:
+            profile = dict(zip(self.encoder.columns, self.encode_row(body["profile"])))
+            sessions = self.similarity.similar_profile(profile, k)
+        else:
+            raise ValueError("Send either 'calories' or 'profile'")
+        return {"sessions": json.loads(sessions.to_json(orient="records", double_precision=4))}
+
+
+def make_handler(service):
+    routes = {"/predict": service.predict, "/percentile": service.percentile, "/similar": service.similar}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._reply(200, service.batcher.stats())
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            route = routes.get(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            if route is None:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                body = json.loads(raw or b"{}")
+                if not isinstance(body, dict):
+                    raise ValueError("Request body must be a JSON object")
+                self._reply(200, route(body))
+            except (ValueError, KeyError, TypeError) as error:
+                self._reply(400, {"error": str(error)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # room for many clients connecting at once
+
+
+# Function to create the server; call serve_forever() on the result
+def make_server(host="127.0.0.1", port=8765, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+    service = PredictionService(window, max_batch)
+    return Server((host, port), make_handler(service))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW * 1000, help="0 disables batching")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.window_ms / 1000, args.max_batch)
+    print(f"Serving on http://{args.host}:{args.port}", flush=True)
+    server.serve_forever()
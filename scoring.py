@@ -0,0 +1,121 @@
+# Calorie prediction outside the Streamlit page: feature building, vectorized batch
+# scoring with the cached model, and a CLI that scores a CSV of sessions in chunks.
+#
+#   python scoring.py sessions.csv predictions.csv [--chunksize 100000]
+#
+# Input rows need Age, Duration, Heart_Rate, Body_Temp, either BMI or Weight/Height, and
+# either Gender (male/female) or Gender_male. Output is the input plus Predicted_Calories
+# (empty for rows with a missing input).
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import feature_encoder
+import model_store
+
+# Columns the calorie model expects when it was trained by this app
+MODEL_COLUMNS = ["Age", "BMI", "Duration", "Heart_Rate", "Body_Temp", "Gender_male"]
+
+
+# Function to get a model's feature encoder (the app's training schema when no model is given)
+def encoder_for(model=None):
+    if model is None:
+        return feature_encoder.FeatureEncoder.from_columns(MODEL_COLUMNS)
+    return feature_encoder.for_model(model)
+
+
+# Function to turn raw session rows into the model's numeric columns, in the model's order
+def build_features(frame, model=None):
+    encoder = encoder_for(model)
+    return pd.DataFrame(encoder.encode(frame), columns=encoder.columns, index=frame.index)
+
+
+# Function to predict from rows already encoded in the model's column order. sklearn models
+# were fitted on named columns and get a frame; the packed forest takes the array as is.
+def predict_encoded(model, X):
+    if hasattr(model, "get_params"):
+        X = pd.DataFrame(X, columns=model.feature_names_in_)
+    return np.asarray(model.predict(X), dtype=np.float64)
+
+
+# Function to flag the encoded rows the model can't score: a missing input (e.g. an empty
+# Weight or Height, so no BMI) or a missing category such as an empty Gender
+def invalid_rows(encoder, frame, X):
+    invalid = ~np.isfinite(X).all(axis=1)
+    for column, (source, _) in encoder.one_hot.items():
+        if column not in frame and source in frame:
+            invalid |= pd.isna(frame[source]).to_numpy()
+    return invalid
+
+
+# Function to predict calories burned for every row of a frame at once. Rows with missing
+# inputs get NaN instead of a prediction.
+def predict_batch(model, frame):
+    if len(frame) == 0:
+        return np.empty(0)
+    encoder = encoder_for(model)
+    X = encoder.encode(frame)
+    invalid = invalid_rows(encoder, frame, X)
+    predictions = np.full(len(frame), np.nan)
+    if not invalid.all():
+        predictions[~invalid] = predict_encoded(model, X[~invalid])
+    return predictions
+
+
+# Function to get the model the app serves for the current data and config. A published
+# forest is attached from its shared arrays, as the app does; otherwise the app's trainer
+# loads or builds the model (publishing forests, so the next process attaches them).
+# With train=False, returns None when no process has trained it yet.
+def load_model(train=True):
+    model = model_store.get_shared_forest(model_store.model_key())
+    if model is None and not train:
+        model = model_store.get_model()
+    elif model is None:
+        import model_trainer
+
+        trainer = model_trainer.get_trainer()
+        trainer.start()
+        while trainer.is_busy():
+            time.sleep(0.1)
+        model = trainer.current_model()
+        if model is None:
+            raise RuntimeError(f"The calorie model could not be built: {trainer.status()['error']}")
+    return model
+
+
+# Function to score an input CSV into an output CSV, chunk by chunk. Rows with missing
+# inputs are written with an empty Predicted_Calories. Returns (rows, unscored rows, seconds).
+def score_csv(input_path, output_path, model, chunksize=100_000):
+    start = time.perf_counter()
+    rows = 0
+    unscored = 0
+    header = True
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        predictions = predict_batch(model, chunk)
+        chunk["Predicted_Calories"] = np.round(predictions, 2)
+        chunk.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+        rows += len(chunk)
+        unscored += int(np.isnan(predictions).sum())
+    if header:
+        # Empty input: still write a header-only output
+        pd.read_csv(input_path, nrows=0).assign(Predicted_Calories=[]).to_csv(output_path, index=False)
+    return rows, unscored, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="CSV of sessions to score")
+    parser.add_argument("output", help="CSV to write with a Predicted_Calories column")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    model = load_model()
+    rows, unscored, seconds = score_csv(args.input, args.output, model, args.chunksize)
+    print(f"{rows} rows scored in {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} rows/s)", file=sys.stderr)
+    if unscored:
+        print(f"Warning: {unscored} rows had missing inputs and were written without a prediction", file=sys.stderr)
@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+# Features compared in "similar profile" mode (Gender is encoded as Gender_male 0/1)
+PROFILE_FEATURES = ["Age", "BMI", "Duration", "Heart_Rate", "Body_Temp", "Gender_male"]
+
+
+# Finds the k sessions most like a given one, either by calories burned (a sorted
+# calorie array searched with bisect) or by profile (a KD-tree on standardized features).
+class SimilarityIndex:
+    def __init__(self, df):
+        self.df = df
+
+        calories = df["Calories"].to_numpy(dtype=np.float64)
+        self.calorie_order = np.argsort(calories, kind="stable")
+        self.sorted_calories = calories[self.calorie_order]
+
+        features = self.profile_matrix(df)
+        self.mean = features.mean(axis=0)
+        self.std = features.std(axis=0)
+        self.std[self.std == 0] = 1.0
+        self.tree = KDTree((features - self.mean) / self.std)
+
+    @staticmethod
+    def profile_matrix(df):
+        columns = []
+        for feature in PROFILE_FEATURES:
+            if feature == "Gender_male" and feature not in df.columns:
+                columns.append((df["Gender"] == "male").to_numpy(dtype=np.float64))
+            else:
+                columns.append(df[feature].to_numpy(dtype=np.float64))
+        return np.column_stack(columns)
+
+    # Function to get the row positions of the k sessions with the closest calorie count
+    def nearest_calories(self, calories, k=5):
+        k = min(k, len(self.sorted_calories))
+        position = np.searchsorted(self.sorted_calories, calories)
+        start = max(position - k, 0)
+        window = self.sorted_calories[start:position + k]
+        closest = np.argsort(np.abs(window - calories), kind="stable")[:k]
+        return self.calorie_order[start + closest]
+
+    # Function to get the row positions of the k sessions with the closest profiles
+    def nearest_profiles(self, profiles, k=5):
+        k = min(k, len(self.df))
+        queries = (np.atleast_2d(np.asarray(profiles, dtype=np.float64)) - self.mean) / self.std
+        _, positions = self.tree.query(queries, k=k)
+        return positions
+
+    def similar_calories(self, calories, k=5):
+        return self.df.iloc[self.nearest_calories(calories, k)]
+
+    # profile is a mapping (or one-row DataFrame) with the PROFILE_FEATURES columns
+    def similar_profile(self, profile, k=5):
+        row = [float(np.asarray(profile[feature]).ravel()[0]) for feature in PROFILE_FEATURES]
+        return self.df.iloc[self.nearest_profiles(row, k)[0]]
+
+
+_index = None
+_indexed_df = None
+_lock = threading.Lock()
+
+
+# Function to get the index for the shared exercise_df, rebuilding it when the data is reloaded
+def get_index(df):
+    global _index, _indexed_df
+    with _lock:
+        if _indexed_df is not df or _index is None:
+            _index = SimilarityIndex(df)
+            _indexed_df = df
+    return _index
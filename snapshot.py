@@ -0,0 +1,112 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from file_utils import file_digest, file_lock
+
+# Folder holding the pre-joined columnar snapshot of the training data
+SNAPSHOT_DIR = "data_snapshot"
+MANIFEST_FILE = "manifest.json"
+# Held while a snapshot is written and old column files are removed, so workers rebuilding
+# at the same time don't write over or delete each other's files
+LOCK_FILE = "snapshot.lock"
+
+
+# Function to describe a source file so we can tell when it changes
+def source_info(path):
+    info = os.stat(path)
+    return {"mtime_ns": info.st_mtime_ns, "size": info.st_size, "sha256": file_digest(path)}
+
+
+# Function to read the manifest, or None if there is no usable snapshot
+def read_manifest(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# Function to check that the snapshot was built from the current source files.
+# mtime and size are checked first; the hash is only computed when they differ.
+def is_fresh(manifest, source_files):
+    if manifest is None or sorted(manifest["sources"]) != sorted(source_files):
+        return False
+    for path in source_files:
+        recorded = manifest["sources"][path]
+        info = os.stat(path)
+        if (info.st_mtime_ns, info.st_size) == (recorded["mtime_ns"], recorded["size"]):
+            continue
+        if file_digest(path) != recorded["sha256"]:
+            return False
+    return True
+
+
+# Function to write a DataFrame as one .npy file per column plus a manifest.
+# Each column goes to a temporary file that is renamed into place, so a process mapping
+# the snapshot never sees a half-written column.
+def write_snapshot(df, source_files, extra=None, snapshot_dir=SNAPSHOT_DIR):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    sources = {path: source_info(path) for path in source_files}
+    version = "".join(sources[path]["sha256"][:8] for path in source_files)
+    with file_lock(os.path.join(snapshot_dir, LOCK_FILE)):
+        # Another worker may have written this version while we were waiting
+        manifest = read_manifest(snapshot_dir)
+        if manifest is not None and manifest["version"] == version and all(
+                os.path.exists(os.path.join(snapshot_dir, entry["file"])) for entry in manifest["columns"].values()):
+            return manifest
+        return _write_snapshot(df, sources, version, extra, snapshot_dir)
+
+
+def _write_snapshot(df, sources, version, extra, snapshot_dir):
+
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        entry = {"file": f"{column}.{version}.npy"}
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            entry["categories"] = [str(c) for c in values.cat.categories]
+            array = values.cat.codes.to_numpy()
+        else:
+            array = values.to_numpy()
+        path = os.path.join(snapshot_dir, entry["file"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+        entry["dtype"] = str(array.dtype)
+        columns[column] = entry
+
+    manifest = {
+        "rows": len(df),
+        "version": version,
+        "sources": sources,
+        "columns": columns,
+        "extra": extra or {},
+    }
+
+    # Replace the manifest atomically, then remove column files from older versions
+    tmp_path = os.path.join(snapshot_dir, f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(snapshot_dir, MANIFEST_FILE))
+
+    current = {entry["file"] for entry in columns.values()}
+    for name in os.listdir(snapshot_dir):
+        if name.endswith(".npy") and name not in current:
+            os.remove(os.path.join(snapshot_dir, name))
+    return manifest
+
+
+# Function to open the snapshot as a DataFrame backed by memory-mapped columns
+def load_snapshot(manifest, snapshot_dir=SNAPSHOT_DIR):
+    data = {}
+    for column, entry in manifest["columns"].items():
+        array = np.load(os.path.join(snapshot_dir, entry["file"]), mmap_mode="r")
+        if "categories" in entry:
+            data[column] = pd.Categorical.from_codes(array, entry["categories"])
+        else:
+            data[column] = array
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,212 @@
+# Out-of-core ingestion for exercise datasets larger than RAM.
+#
+# calories.csv is reduced to a sorted User_ID -> Calories index (12 bytes per row), then
+# exercise.csv is streamed in chunks: each chunk is joined on User_ID with a binary
+# search, gets BMI and Gender_male, and is fed to a streaming learner. Peak memory is
+# bounded by the chunk size, the calorie index and the learner's state, not the data size.
+#
+#   python streaming_ingest.py --learner poly|forest [--chunksize 200000] [--sample 200000] [--out model.joblib]
+
+import argparse
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_encoder import FeatureEncoder
+
+FEATURES = ["Age", "BMI", "Duration", "Heart_Rate", "Body_Temp", "Gender_male"]
+ENCODER = FeatureEncoder.from_columns(FEATURES)
+
+
+# Function to build the sorted User_ID -> Calories lookup, reading calories.csv in chunks
+def calorie_index(calories_file, chunksize):
+    ids, calories = [], []
+    for chunk in pd.read_csv(calories_file, chunksize=chunksize, dtype={"User_ID": np.int64, "Calories": np.float32}):
+        ids.append(chunk["User_ID"].to_numpy())
+        calories.append(chunk["Calories"].to_numpy())
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+    calories = np.concatenate(calories) if calories else np.empty(0, dtype=np.float32)
+    order = np.argsort(ids, kind="stable")
+    return ids[order], calories[order]
+
+
+# Generator of (features, calories) arrays, one pair per joined chunk of exercise.csv
+def stream_chunks(exercise_file="exercise.csv", calories_file="calories.csv", chunksize=200_000):
+    sorted_ids, sorted_calories = calorie_index(calories_file, chunksize)
+    for chunk in pd.read_csv(exercise_file, chunksize=chunksize):
+        user_ids = chunk["User_ID"].to_numpy(dtype=np.int64)
+        position = np.searchsorted(sorted_ids, user_ids)
+        position[position == len(sorted_ids)] = 0
+        matched = sorted_ids[position] == user_ids if len(sorted_ids) else np.zeros(len(chunk), dtype=bool)
+        if not matched.any():
+            continue
+
+        X = ENCODER.encode(chunk[matched]).astype(np.float32)
+        yield X, sorted_calories[position[matched]]
+
+
+# Degree-2 polynomial least squares fitted from streamed chunks by accumulating the normal
+# equations (X'X and X'y). The result equals fitting the closed-form "poly" backend on all rows.
+class StreamingPolyRegressor:
+    def __init__(self, degree=2):
+        self.degree = degree
+        self.feature_names_in_ = np.array(FEATURES, dtype=object)
+        self._xtx = None
+        self._xty = None
+        self.coef_ = None
+
+    def _expand(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        columns = [np.ones(len(X))] + [X[:, i] for i in range(X.shape[1])]
+        if self.degree >= 2:
+            for i in range(X.shape[1]):
+                for j in range(i, X.shape[1]):
+                    columns.append(X[:, i] * X[:, j])
+        return np.column_stack(columns)
+
+    def partial_fit(self, X, y):
+        Z = self._expand(X)
+        if self._xtx is None:
+            self._xtx = np.zeros((Z.shape[1], Z.shape[1]))
+            self._xty = np.zeros(Z.shape[1])
+        self._xtx += Z.T @ Z
+        self._xty += Z.T @ np.asarray(y, dtype=np.float64)
+        return self
+
+    def finalize(self):
+        self.coef_ = np.linalg.lstsq(self._xtx, self._xty, rcond=None)[0]
+        return self
+
+    def predict(self, X):
+        if hasattr(X, "columns"):
+            X = X[FEATURES].to_numpy()
+        return self._expand(X) @ self.coef_
+
+
+# Stratified reservoir sample with exactly `capacity` rows (or every row, if fewer were seen),
+# so a RandomForest can be trained on a representative, bounded subset of the stream.
+#
+# Strata are Gender x Duration band: inputs only, so the sample keeps p(Calories | inputs)
+# as it is in the data. Every row gets a random key and only the rows with the `budget`
+# smallest keys across all strata are kept (budget = capacity plus `slack`), so the state
+# stays bounded however many strata the data has. What a stratum keeps is a uniform sample
+# of its rows. At the end the capacity is split across strata in proportion to the rows
+# each one saw (largest remainders get the leftover slots) and each stratum gives its
+# smallest keys; the slack covers strata that kept slightly fewer rows than their share.
+class StratifiedReservoir:
+    def __init__(self, capacity, band_width=5.0, slack=0.25, seed=0):
+        self.capacity = capacity
+        self.budget = capacity + int(np.ceil(capacity * slack))
+        self.band_width = band_width
+        self.rng = np.random.default_rng(seed)
+        self.samples = {}
+        self.threshold = 1.0  # rows with larger keys can no longer make the sample
+
+    def add(self, X, y):
+        keys = self.rng.random(len(y))
+        band = (X[:, FEATURES.index("Duration")] // self.band_width).astype(np.int64)
+        strata = X[:, FEATURES.index("Gender_male")].astype(np.int64) + 2 * band
+        candidate = keys < self.threshold
+        for stratum in np.unique(strata):
+            sample = self.samples.get(stratum)
+            if sample is None:
+                sample = self.samples[stratum] = {"keys": np.empty(0), "X": np.empty((0, X.shape[1]), dtype=np.float32),
+                                                  "y": np.empty(0, dtype=np.float32), "seen": 0}
+            in_stratum = strata == stratum
+            rows = np.flatnonzero(in_stratum & candidate)
+            sample.update(keys=np.concatenate([sample["keys"], keys[rows]]),
+                          X=np.concatenate([sample["X"], X[rows].astype(np.float32)]),
+                          y=np.concatenate([sample["y"], y[rows].astype(np.float32)]),
+                          seen=sample["seen"] + int(in_stratum.sum()))
+        self._trim()
+
+    # Function to drop every row whose key is not among the `budget` smallest overall
+    def _trim(self):
+        all_keys = np.concatenate([sample["keys"] for sample in self.samples.values()])
+        if len(all_keys) <= self.budget:
+            return
+        self.threshold = np.partition(all_keys, self.budget)[self.budget]
+        for sample in self.samples.values():
+            kept = sample["keys"] < self.threshold
+            sample.update(keys=sample["keys"][kept], X=sample["X"][kept], y=sample["y"][kept])
+
+    # Function to split the capacity across strata in proportion to the rows each one saw
+    # (a stratum never gets more rows than it kept; its shortfall goes to the others)
+    def allocation(self):
+        strata = list(self.samples)
+        seen = np.array([self.samples[stratum]["seen"] for stratum in strata])
+        kept = np.array([len(self.samples[stratum]["keys"]) for stratum in strata])
+        total = min(self.capacity, kept.sum())
+        quotas = total * seen / seen.sum() if seen.sum() else np.zeros(len(strata))
+        counts = np.minimum(np.floor(quotas).astype(np.int64), kept)
+        order = np.argsort(-(quotas - counts), kind="stable")
+        while counts.sum() < total:
+            for i in order:
+                if counts.sum() < total and counts[i] < kept[i]:
+                    counts[i] += 1
+        return dict(zip(strata, counts.tolist()))
+
+    def frame(self):
+        parts_X, parts_y = [], []
+        for stratum, count in self.allocation().items():
+            sample = self.samples[stratum]
+            chosen = np.argsort(sample["keys"], kind="stable")[:count]
+            parts_X.append(sample["X"][chosen])
+            parts_y.append(sample["y"][chosen])
+        return pd.DataFrame(np.concatenate(parts_X), columns=FEATURES), np.concatenate(parts_y)
+
+
+# Function to get this process's peak resident memory in MB
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Function to ingest the CSVs chunk by chunk into the chosen learner and report throughput
+def run(learner="poly", exercise_file="exercise.csv", calories_file="calories.csv",
+        chunksize=200_000, sample=200_000, params=None):
+    start = time.perf_counter()
+    rows = 0
+    if learner == "poly":
+        model = StreamingPolyRegressor()
+        for X, y in stream_chunks(exercise_file, calories_file, chunksize):
+            model.partial_fit(X, y)
+            rows += len(X)
+        model.finalize()
+    else:
+        import model_backends
+        import model_store
+
+        reservoir = StratifiedReservoir(sample)
+        for X, y in stream_chunks(exercise_file, calories_file, chunksize):
+            reservoir.add(X, y)
+            rows += len(X)
+        X_sample, y_sample = reservoir.frame()
+        model = model_backends.make_model(dict(params or model_store.MODEL_PARAMS, backend="forest", n_jobs=-1))
+        model.fit(X_sample, y_sample)
+
+    elapsed = time.perf_counter() - start
+    report = {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else 0.0,
+              "peak_rss_mb": peak_rss_mb()}
+    return model, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--learner", choices=["poly", "forest"], default="poly")
+    parser.add_argument("--exercise", default="exercise.csv")
+    parser.add_argument("--calories", default="calories.csv")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--sample", type=int, default=200_000, help="reservoir size for the forest")
+    parser.add_argument("--out", help="save the fitted model here with joblib")
+    args = parser.parse_args()
+
+    model, report = run(args.learner, args.exercise, args.calories, args.chunksize, args.sample)
+    print(f"{report['rows']} rows in {report['seconds']:.2f}s ({report['rows_per_sec']:.0f} rows/s), "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB")
+    if args.out:
+        import joblib
+        joblib.dump(model, args.out)
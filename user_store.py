@@ -0,0 +1,424 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+import instrumentation
+from file_utils import file_lock
+
+# Paths for the user stores
+EXCEL_FILE = "users.xlsx"
+SQLITE_FILE = "users.db"
+LOCK_FILE = "users.lock"
+
+# Which backend load_users/save_users use: "sqlite" (default) or "excel"
+BACKEND = os.environ.get("USER_STORE_BACKEND", "sqlite")
+
+COLUMNS = ["Username", "Password", "Name", "DOB", "Security_Question", "Security_Answer", "Last_Attendance"]
+FIELDS = COLUMNS[1:]
+
+
+# Function to turn a value read from Excel into something SQLite can store
+def clean_value(value):
+    if value is None or (isinstance(value, float) and value != value):  # NaN
+        return None
+    if isinstance(value, datetime):  # Includes pandas Timestamps
+        return str(value.date())
+    return value if isinstance(value, (int, float)) else str(value)
+
+
+# Original store: the whole users dict is rewritten to users.xlsx on every change
+class ExcelUserStore:
+    def __init__(self, path=EXCEL_FILE):
+        self.path = path
+
+    def load_all(self):
+        import pandas as pd  # Only the Excel backend needs pandas
+
+        try:
+            # Load the Excel file
+            df = pd.read_excel(self.path)
+
+            # Ensure column names are stripped of whitespace
+            df.columns = df.columns.str.strip()
+
+            # Check if "Username" column exists
+            if "Username" not in df.columns:
+                raise KeyError("The 'Username' column is missing from the Excel file!")
+
+            return df.set_index("Username").to_dict(orient="index")
+
+        except (FileNotFoundError, KeyError):
+            # If file is missing or "Username" column is missing, create a new file
+            pd.DataFrame(columns=COLUMNS).to_excel(self.path, index=False)
+            return {}
+
+    def save_all(self, users_dict):
+        import pandas as pd
+
+        if not users_dict:
+            pd.DataFrame(columns=COLUMNS).to_excel(self.path, index=False)
+            return
+        df = pd.DataFrame.from_dict(users_dict, orient="index").reset_index()
+        if len(df.columns) != len(COLUMNS):  # Writing it anyway would corrupt the user file
+            raise ValueError(f"User records have columns {list(df.columns[1:])}, expected {FIELDS}")
+        df.columns = COLUMNS
+        df.to_excel(self.path, index=False)
+
+    def get(self, username):
+        return self.load_all().get(username)
+
+    # Token that changes whenever the file is rewritten
+    def version(self):
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def upsert(self, username, record):
+        users = self.load_all()
+        users[username] = record
+        self.save_all(users)
+
+    # Apply a group of mutations with a single read and a single rewrite of the file
+    def apply_batch(self, mutations):
+        users = self.load_all()
+        results = []
+        for username, mutate in mutations:
+            try:
+                record, result = mutate(users.get(username))
+                if record is not None:
+                    users[username] = record
+                results.append((result, None))
+            except Exception as error:
+                results.append((None, error))
+        self.save_all(users)
+        return results
+
+
+# Embedded transactional store: one row per user, indexed by username, WAL journal
+class SQLiteUserStore:
+    CREATE_TABLE = ("CREATE TABLE IF NOT EXISTS users ("
+                    "Username TEXT PRIMARY KEY, Password TEXT, Name TEXT, DOB TEXT, "
+                    "Security_Question TEXT, Security_Answer TEXT, Last_Attendance TEXT)")
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        with self.connect() as conn:
+            conn.execute(self.CREATE_TABLE)
+
+    # Each thread (Streamlit session) gets its own connection
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_all(self):
+        rows = self.connect().execute(f"SELECT {', '.join(COLUMNS)} FROM users").fetchall()
+        return {row[0]: dict(zip(FIELDS, row[1:])) for row in rows}
+
+    def save_all(self, users_dict):
+        with self.connect() as conn:
+            conn.executemany(self._upsert_sql(), [self._row(u, r) for u, r in users_dict.items()])
+
+    def get(self, username):
+        row = self.connect().execute(
+            f"SELECT {', '.join(FIELDS)} FROM users WHERE Username = ?", (username,)
+        ).fetchone()
+        return dict(zip(FIELDS, row)) if row else None
+
+    def upsert(self, username, record):
+        with self.connect() as conn:
+            conn.execute(self._upsert_sql(), self._row(username, record))
+
+    # Token that changes whenever any connection, in any process, commits a change.
+    # PRAGMA data_version ignores the asking connection's own commits, so it gets a
+    # dedicated connection that never writes.
+    def version(self):
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # Apply a group of mutations in one transaction, each reading its record's latest state
+    def apply_batch(self, mutations):
+        conn = self.connect()
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for username, mutate in mutations:
+                try:
+                    record, result = mutate(self.get(username))
+                    if record is not None:
+                        conn.execute(self._upsert_sql(), self._row(username, record))
+                    results.append((result, None))
+                except Exception as error:
+                    results.append((None, error))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return results
+
+    @staticmethod
+    def _upsert_sql():
+        updates = ", ".join(f"{field} = excluded.{field}" for field in FIELDS)
+        return (f"INSERT INTO users ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT(Username) DO UPDATE SET {updates}")
+
+    @staticmethod
+    def _insert_missing_sql():
+        return (f"INSERT INTO users ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT(Username) DO NOTHING")
+
+    @staticmethod
+    def _row(username, record):
+        return [str(username)] + [clean_value(record.get(field)) for field in FIELDS]
+
+
+# Function to copy every user from users.xlsx into the SQLite store (one shot), returning
+# how many were added. A new database is built under a temporary name and renamed into
+# place, so the SQLite file only ever exists complete: a failed migration leaves nothing
+# and runs again. If the database already exists, only users missing from it are added;
+# the rows it has are newer than the workbook (password resets, attendance) and are kept.
+def migrate_excel_to_sqlite(excel_file=EXCEL_FILE, sqlite_file=SQLITE_FILE):
+    users = ExcelUserStore(excel_file).load_all()
+    if os.path.exists(sqlite_file):
+        conn = SQLiteUserStore(sqlite_file).connect()
+        try:
+            with conn:
+                before = conn.total_changes
+                conn.executemany(SQLiteUserStore._insert_missing_sql(),
+                                 [SQLiteUserStore._row(u, r) for u, r in users.items()])
+                return conn.total_changes - before
+        finally:
+            conn.close()
+
+    tmp_path = f"{sqlite_file}.{os.getpid()}.tmp"
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                conn.execute(SQLiteUserStore.CREATE_TABLE)
+                conn.executemany(SQLiteUserStore._upsert_sql(), [SQLiteUserStore._row(u, r) for u, r in users.items()])
+        finally:
+            conn.close()
+        os.replace(tmp_path, sqlite_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(users)
+
+
+# Single writer for a store. Sessions submit per-record mutations; the writer thread
+# drains everything waiting in the queue and commits it as one group under the file lock.
+#
+# A mutation is a function taking the user's current record (or None) and returning
+# (new_record or None to leave it unchanged, result for the caller).
+class CommitQueue:
+    def __init__(self, store, lock_path=LOCK_FILE, max_batch=500):
+        self.store = store
+        self.lock_path = lock_path
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {"commits": 0, "mutations": 0, "busy_time": 0.0, "total_latency": 0.0, "max_latency": 0.0}
+        self._started = time.perf_counter()
+        threading.Thread(target=self._run, name="user-commit-queue", daemon=True).start()
+
+    def submit(self, username, mutate):
+        future = Future()
+        self._queue.put((username, mutate, future, time.perf_counter()))
+        return future
+
+    def apply(self, username, mutate, timeout=None):
+        return self.submit(username, mutate).result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            start = time.perf_counter()
+            try:
+                with file_lock(self.lock_path):
+                    results = self.store.apply_batch([(username, mutate) for username, mutate, _, _ in batch])
+            except Exception as error:
+                results = [(None, error)] * len(batch)
+            done = time.perf_counter()
+
+            for (_, _, future, _), (result, error) in zip(batch, results):
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+            with self._stats_lock:
+                self._stats["commits"] += 1
+                self._stats["mutations"] += len(batch)
+                self._stats["busy_time"] += done - start
+                for _, _, _, submitted in batch:
+                    latency = done - submitted
+                    self._stats["total_latency"] += latency
+                    self._stats["max_latency"] = max(self._stats["max_latency"], latency)
+
+    # Throughput and latency counters
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        mutations = stats["mutations"]
+        stats["avg_batch_size"] = mutations / stats["commits"] if stats["commits"] else 0.0
+        stats["avg_latency"] = stats["total_latency"] / mutations if mutations else 0.0
+        stats["mutations_per_sec"] = mutations / (time.perf_counter() - self._started)
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+
+# Process-wide read-through cache of user records, shared by all sessions.
+#
+# Every lookup first asks the store for its version token (one stat call or one PRAGMA),
+# and drops the cached records when it changed, so changes made by other sessions or
+# processes are seen on the next lookup. SQLite records are read one at a time on first
+# use; the Excel file has no cheap point lookup, so it is read whole once per version.
+# Each read from the store is recorded as a "user_load" stage (cache hits are not).
+# Supports `username in cache`, `cache[username]` and `cache[username] = record`.
+class UserCache:
+    def __init__(self, store):
+        self.store = store
+        self.full_load = isinstance(store, ExcelUserStore)
+        self._records = {}  # username -> record, or None for a username known not to exist
+        self._version = None
+        self._checked = False
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "reloads": 0, "reload_time": 0.0}
+
+    def _refresh(self):
+        version = self.store.version()
+        # Sessions arriving during a reload wait for it instead of seeing a half-empty cache
+        with self._reload_lock:
+            if self._checked and version == self._version:
+                return version
+            records = {}
+            if self.full_load:
+                start = time.perf_counter()
+                with instrumentation.stage("user_load", source="full_load"):
+                    records = self.store.load_all()
+                with self._lock:
+                    self._stats["reloads"] += 1
+                    self._stats["reload_time"] += time.perf_counter() - start
+            with self._lock:
+                if self._checked:
+                    self._stats["invalidations"] += 1
+                self._records = records
+                self._version = version
+                self._checked = True
+        return version
+
+    def get(self, username):
+        version = self._refresh()
+        with self._lock:
+            if username in self._records or (self.full_load and self._version == version):
+                self._stats["hits"] += 1
+                return self._records.get(username)
+            self._stats["misses"] += 1
+
+        start = time.perf_counter()
+        with instrumentation.stage("user_load", source="get"):
+            record = self.store.get(username)
+        with self._lock:
+            self._stats["reload_time"] += time.perf_counter() - start
+            # A change committed meanwhile moved the version on, so this entry is dropped next time
+            if self._version == version:
+                self._records[username] = record
+        return record
+
+    def __contains__(self, username):
+        return self.get(username) is not None
+
+    def __getitem__(self, username):
+        record = self.get(username)
+        if record is None:
+            raise KeyError(username)
+        return record
+
+    # Keep a record this process just committed, until the store's version moves on
+    def __setitem__(self, username, record):
+        with self._lock:
+            self._records[username] = record
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, cached=len(self._records))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_store = None
+_commit_queue = None
+_user_cache = None
+_store_lock = threading.Lock()
+
+
+# Function to get the configured store, migrating users.xlsx on first use of SQLite
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            if BACKEND == "excel":
+                _store = ExcelUserStore()
+            else:
+                if not os.path.exists(SQLITE_FILE) and os.path.exists(EXCEL_FILE):
+                    with file_lock(LOCK_FILE):
+                        if not os.path.exists(SQLITE_FILE):  # Another process may have migrated meanwhile
+                            migrate_excel_to_sqlite()
+                _store = SQLiteUserStore()
+    return _store
+
+
+# Function to get the process-wide commit queue for the configured store
+def get_commit_queue():
+    global _commit_queue
+    store = get_store()
+    with _store_lock:
+        if _commit_queue is None:
+            _commit_queue = CommitQueue(store)
+    return _commit_queue
+
+
+# Function to get the process-wide user cache for the configured store
+def get_user_cache():
+    global _user_cache
+    store = get_store()
+    with _store_lock:
+        if _user_cache is None:
+            _user_cache = UserCache(store)
+    return _user_cache
+
+
+# Function to apply one per-record mutation through the commit queue and wait for it
+def commit(username, mutate):
+    return get_commit_queue().apply(username, mutate)
+
+
+if __name__ == "__main__":
+    # One-shot migration: python user_store.py [users.xlsx] [users.db]
+    count = migrate_excel_to_sqlite(*sys.argv[1:3])
+    print(f"Migrated {count} users into SQLite (users already in the database were left as they are)")